@@ -0,0 +1,104 @@
+"""In-process caches shared by the API workers."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+from .config import settings
+
+
+class LRUCache:
+    """Thread-safe, size bounded mapping with an optional time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CatalogCache:
+    """Cache of rendered catalog responses guarded by a version counter.
+
+    Readers capture :attr:`version` before querying the database and hand it
+    back to :meth:`set`; a write that bumped the counter in the meantime makes
+    the late result be dropped instead of cached. The counter is per process,
+    so the TTL bounds how long other workers may serve a stale catalog.
+    :attr:`bumped_at` (monotonic) lets readers avoid lagging replicas right
+    after a write.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float]) -> None:
+        self.version = 0
+        self.bumped_at = float("-inf")
+        self._entries = LRUCache(max_entries, ttl_seconds)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self._entries.get((self.version, key))
+
+    def set(self, key: Hashable, value: Any, version: int) -> None:
+        if version == self.version:
+            self._entries.set((version, key), value)
+
+    def bump(self) -> int:
+        with self._lock:
+            self.version += 1
+            self.bumped_at = time.monotonic()
+            self._entries.clear()
+            return self.version
+
+
+catalog_cache = CatalogCache(
+    max_entries=settings.catalog_cache_max_entries,
+    ttl_seconds=settings.catalog_cache_ttl_seconds,
+)
+
+
+_catalog_listeners: List[Callable[[], None]] = []
+
+
+def on_catalog_change(listener: Callable[[], None]) -> None:
+    """Call ``listener`` after every :func:`invalidate_catalog` in this process."""
+
+    _catalog_listeners.append(listener)
+
+
+def invalidate_catalog() -> None:
+    """Signal that courses, sessions or reference data changed."""
+
+    catalog_cache.bump()
+    for listener in _catalog_listeners:
+        listener()
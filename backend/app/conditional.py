@@ -0,0 +1,102 @@
+"""Conditional GET (``ETag`` / ``If-None-Match``) for the catalog and reference data.
+
+The validators of a response summarize the tables it is built from, read with
+one aggregate query: per table its row count, the sum of its ids (which
+changes with the id set) and its latest ``updated_at``. They are kept in
+:data:`cache.catalog_cache`, so they are computed once per catalog version and
+worker, and a revalidation answered with ``304 Not Modified`` usually touches
+neither the database nor the serializers.
+
+No ``Last-Modified`` is sent: the latest ``updated_at`` does not move when a
+row is deleted, so ``If-Modified-Since`` would keep deleted rows cached.
+"""
+
+import hashlib
+from typing import Dict, Hashable, NamedTuple, Optional, Sequence, Type, Union
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .cache import catalog_cache
+from .models.entities import Ambience, Category, Course, CourseSession, Level
+
+CATALOG_TABLES = (Course, CourseSession, Category, Level, Ambience)
+
+NOT_MODIFIED_RESPONSES = {
+    status.HTTP_304_NOT_MODIFIED: {"description": "The `If-None-Match` validator still matches"},
+}
+
+
+class Validators(NamedTuple):
+    digest: str
+
+
+def _cache_key(models: Sequence[Type[SQLModel]]) -> Hashable:
+    return ("validators", tuple(model.__tablename__ for model in models))
+
+
+def cached_validators(models: Sequence[Type[SQLModel]]) -> Optional[Validators]:
+    return catalog_cache.get(_cache_key(models))
+
+
+def load_validators(session: Session, models: Sequence[Type[SQLModel]]) -> Validators:
+    """Read the validators of ``models`` with one query and cache them."""
+
+    version = catalog_cache.version
+    columns = []
+    for model in models:
+        table = model.__table__
+        columns += [
+            select(func.count()).select_from(table).scalar_subquery(),
+            select(func.coalesce(func.sum(table.c.id), 0)).scalar_subquery(),
+            select(func.max(table.c.updated_at)).scalar_subquery(),
+        ]
+    row = tuple(session.execute(select(*columns)).one())
+    validators = Validators(digest=hashlib.blake2b(repr(row).encode(), digest_size=16).hexdigest())
+    catalog_cache.set(_cache_key(models), validators, version)
+    return validators
+
+
+def validator_headers(validators: Validators, variant: Hashable = None) -> Dict[str, str]:
+    """Headers of a response built from the tables of ``validators``.
+
+    ``variant`` distinguishes the responses built from the same tables, such
+    as the pages and filters of the course list.
+    """
+
+    tag = hashlib.blake2b(f"{validators.digest}:{variant!r}".encode(), digest_size=16).hexdigest()
+    return {"ETag": f'"{tag}"', "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, headers: Dict[str, str]) -> Optional[Response]:
+    """Return a ``304`` response when the request's ``If-None-Match`` matches ``headers``."""
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is None:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags or headers["ETag"] in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+
+def revalidate(
+    request: Request, session: Session, models: Sequence[Type[SQLModel]], variant: Hashable = None
+) -> Union[Response, Dict[str, str]]:
+    """Return the ``304`` answering ``request``, or the validator headers of the full response."""
+
+    validators = cached_validators(models) or load_validators(session, models)
+    headers = validator_headers(validators, variant)
+    return not_modified(request, headers) or headers
+
+
+async def revalidate_async(
+    request: Request, session: AsyncSession, models: Sequence[Type[SQLModel]], variant: Hashable = None
+) -> Union[Response, Dict[str, str]]:
+    """:func:`revalidate` on an :class:`AsyncSession`."""
+
+    validators = cached_validators(models) or await session.run_sync(load_validators, models)
+    headers = validator_headers(validators, variant)
+    return not_modified(request, headers) or headers
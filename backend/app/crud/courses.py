@@ -0,0 +1,233 @@
+"""Data access for courses and their sessions.
+
+Functions take a synchronous :class:`Session` so they can be called directly
+by the sync routers and through ``AsyncSession.run_sync`` by the async ones.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, or_, tuple_, update
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select
+
+from .. import search
+from ..models.entities import Course, CourseSession
+from ..pagination import decode_cursor, encode_cursor
+from ..reference_index import reference_index
+from ..schemas.course import CourseCreate, CourseRead, CourseSummary, CourseUpdate, CourseView
+from ..schemas.session import CourseSessionCreate, CourseSessionRead, CourseSessionUpdate
+from ..serializers import Row, dump, dump_all
+from .rollups import rebuild_progress_rollups
+
+_courses = Course.__table__
+_sessions = CourseSession.__table__
+
+
+@dataclass(frozen=True)
+class CourseFilters:
+    """Query parameters of a catalog page; also used as its cache key."""
+
+    limit: int
+    cursor: Optional[str] = None
+    category_id: Optional[int] = None
+    level_id: Optional[int] = None
+    ambience_id: Optional[int] = None
+    min_duration: Optional[int] = None
+    max_duration: Optional[int] = None
+    view: CourseView = CourseView.FULL
+
+
+def course_select(with_sessions: bool = True) -> Select:
+    """Select courses in catalog order; run it with :func:`load_courses`."""
+
+    statement = select(Course).order_by(Course.title, Course.id)
+    return statement.options(selectinload(Course.sessions)) if with_sessions else statement
+
+
+def load_courses(session: Session, statement: Select) -> List[Course]:
+    """Run a :func:`course_select` statement and attach the references from the in-memory index."""
+
+    courses = session.exec(statement).unique().all()
+    reference_index.attach(session, courses)
+    return courses
+
+
+def load_course(session: Session, course_id: int) -> Course:
+    courses = load_courses(session, course_select().where(Course.id == course_id))
+    if not courses:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return courses[0]
+
+
+def read_course(session: Session, course_id: int) -> Row:
+    return dump(CourseRead, load_course(session, course_id))
+
+
+def list_all_courses(session: Session) -> List[Row]:
+    return dump_all(CourseRead, load_courses(session, course_select()))
+
+
+def list_course_page(session: Session, filters: CourseFilters) -> Tuple[List[Row], Optional[str]]:
+    """Return one page of the catalog and the cursor of the next one.
+
+    Pages are addressed by keyset on ``(title, id)`` rather than offset so each
+    page costs the same whatever its position, and concurrent edits never
+    shift rows between pages. The ``summary`` view skips loading sessions.
+    """
+
+    full = filters.view == CourseView.FULL
+    statement = course_select(with_sessions=full)
+    if filters.cursor:
+        title, course_id = decode_cursor(filters.cursor, 2)
+        statement = statement.where(tuple_(Course.title, Course.id) > tuple_(title, course_id))
+    if filters.category_id is not None:
+        statement = statement.where(Course.category_id == filters.category_id)
+    if filters.level_id is not None:
+        statement = statement.where(Course.level_id == filters.level_id)
+    if filters.ambience_id is not None:
+        statement = statement.where(Course.ambience_id == filters.ambience_id)
+    if filters.min_duration is not None:
+        statement = statement.where(Course.duration_minutes >= filters.min_duration)
+    if filters.max_duration is not None:
+        statement = statement.where(Course.duration_minutes <= filters.max_duration)
+
+    courses = load_courses(session, statement.limit(filters.limit + 1))
+    next_cursor = None
+    if len(courses) > filters.limit:
+        courses = courses[: filters.limit]
+        last = courses[-1]
+        next_cursor = encode_cursor(last.title, last.id)
+    schema = CourseRead if full else CourseSummary
+    return dump_all(schema, courses), next_cursor
+
+
+def search_courses(session: Session, query: str, limit: int, offset: int = 0) -> List[Row]:
+    """Return the courses matching ``query`` ranked by relevance."""
+
+    if not search.search_available:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Search is unavailable")
+    ids = search.search_course_ids(session, query, limit, offset)
+    if not ids:
+        return []
+    courses = {course.id: course for course in load_courses(session, course_select().where(Course.id.in_(ids)))}
+    return dump_all(CourseRead, (courses[course_id] for course_id in ids if course_id in courses))
+
+
+def _adjust_aggregates(session: Session, course_id: int, sessions: int, minutes: int) -> None:
+    """Apply a session count / duration delta to a course in SQL, without reading it."""
+
+    session.execute(
+        update(_courses)
+        .where(_courses.c.id == course_id)
+        .values(
+            session_count=_courses.c.session_count + sessions,
+            sessions_total_minutes=_courses.c.sessions_total_minutes + minutes,
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+
+def rebuild_course_aggregates(session: Session, course_ids: Optional[Sequence[int]] = None) -> int:
+    """Recompute ``session_count`` and ``sessions_total_minutes`` from the sessions.
+
+    Only courses whose stored values drifted are written (and get a new
+    ``updated_at``); returns their number. The caller commits.
+    """
+
+    count = select(func.count()).where(_sessions.c.course_id == _courses.c.id).scalar_subquery()
+    minutes = (
+        select(func.coalesce(func.sum(_sessions.c.duration_minutes), 0))
+        .where(_sessions.c.course_id == _courses.c.id)
+        .scalar_subquery()
+    )
+    statement = (
+        update(_courses)
+        .where(or_(_courses.c.session_count != count, _courses.c.sessions_total_minutes != minutes))
+        .values(session_count=count, sessions_total_minutes=minutes, updated_at=datetime.utcnow())
+    )
+    if course_ids is not None:
+        statement = statement.where(_courses.c.id.in_(course_ids))
+    return session.execute(statement).rowcount
+
+
+def _get_course_or_404(session: Session, course_id: int) -> Course:
+    course = session.get(Course, course_id)
+    if not course:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return course
+
+
+def _get_session_or_404(session: Session, course_id: int, session_id: int) -> CourseSession:
+    course_session = session.get(CourseSession, session_id)
+    if not course_session or course_session.course_id != course_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    return course_session
+
+
+def create_course(session: Session, payload: CourseCreate) -> CourseRead:
+    course = Course(**payload.dict())
+    session.add(course)
+    session.commit()
+    return read_course(session, course.id)
+
+
+def update_course(session: Session, course_id: int, payload: CourseUpdate) -> CourseRead:
+    course = _get_course_or_404(session, course_id)
+    dimensions = (course.category_id, course.level_id)
+    update_data = payload.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(course, key, value)
+    course.updated_at = datetime.utcnow()
+    session.add(course)
+    if (course.category_id, course.level_id) != dimensions:
+        session.flush()
+        rebuild_progress_rollups(session, course_ids=[course.id])
+    session.commit()
+    return read_course(session, course.id)
+
+
+def delete_course(session: Session, course_id: int) -> None:
+    course = _get_course_or_404(session, course_id)
+    session.delete(course)
+    session.commit()
+
+
+def add_course_session(session: Session, course_id: int, payload: CourseSessionCreate) -> CourseSessionRead:
+    course = _get_course_or_404(session, course_id)
+    if payload.course_id and payload.course_id != course_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Mismatching course identifiers")
+    session_data = payload.dict(exclude_unset=True)
+    session_data["course_id"] = course_id
+    course_session = CourseSession(**session_data)
+    session.add(course_session)
+    _adjust_aggregates(session, course.id, 1, course_session.duration_minutes or 0)
+    session.commit()
+    session.refresh(course_session)
+    return CourseSessionRead.from_orm(course_session)
+
+
+def update_course_session(
+    session: Session, course_id: int, session_id: int, payload: CourseSessionUpdate
+) -> CourseSessionRead:
+    course_session = _get_session_or_404(session, course_id, session_id)
+    previous_minutes = course_session.duration_minutes or 0
+    update_data = payload.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(course_session, key, value)
+    course_session.updated_at = datetime.utcnow()
+    session.add(course_session)
+    _adjust_aggregates(session, course_id, 0, (course_session.duration_minutes or 0) - previous_minutes)
+    session.commit()
+    session.refresh(course_session)
+    return CourseSessionRead.from_orm(course_session)
+
+
+def delete_course_session(session: Session, course_id: int, session_id: int) -> None:
+    course_session = _get_session_or_404(session, course_id, session_id)
+    _adjust_aggregates(session, course_id, -1, -(course_session.duration_minutes or 0))
+    session.delete(course_session)
+    session.commit()
@@ -0,0 +1,80 @@
+"""Streaming reads of whole tables for the admin exports.
+
+Rows are read with Core through a server-side cursor (``stream_results`` with
+``yield_per``) and yielded one at a time, so memory stays bounded by
+:data:`YIELD_PER` whatever the size of the table.
+"""
+
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import Table, select
+from sqlalchemy.engine import Connection
+
+from ..models.entities import Course, CourseSession, User, UserProgress
+
+YIELD_PER = 1000
+
+Row = Dict[str, Any]
+
+_courses: Table = Course.__table__
+_sessions: Table = CourseSession.__table__
+
+COURSE_COLUMNS: Tuple[str, ...] = (
+    "id", "title", "description", "duration_minutes", "session_count", "sessions_total_minutes",
+    "category_id", "level_id", "ambience_id", "created_at", "updated_at",
+)
+SESSION_COLUMNS: Tuple[str, ...] = ("id", "title", "description", "order", "duration_minutes", "created_at", "updated_at")
+USER_COLUMNS: Tuple[str, ...] = ("id", "email", "full_name", "created_at", "updated_at")
+PROGRESS_COLUMNS: Tuple[str, ...] = (
+    "id", "user_id", "course_id", "status", "total_listened_seconds", "started_at", "completed_at",
+    "created_at", "updated_at",
+)
+
+
+def _stream(connection: Connection, statement) -> Iterator[Any]:
+    return connection.execution_options(stream_results=True, yield_per=YIELD_PER).execute(statement)
+
+
+def iter_courses(connection: Connection, since: Optional[datetime] = None) -> Iterator[Row]:
+    """Yield every course, ordered by id, with its ``sessions`` embedded.
+
+    Courses and sessions come from a single ordered outer join so only one
+    cursor is open; the sessions of a course are consecutive rows.
+    """
+
+    session_labels = [_sessions.c[name].label(f"session_{name}") for name in SESSION_COLUMNS]
+    statement = (
+        select(*(_courses.c[name] for name in COURSE_COLUMNS), *session_labels)
+        .select_from(_courses.outerjoin(_sessions, _sessions.c.course_id == _courses.c.id))
+        .order_by(_courses.c.id, _sessions.c.order, _sessions.c.id)
+    )
+    if since is not None:
+        statement = statement.where(_courses.c.updated_at >= since)
+
+    for _, rows in groupby(_stream(connection, statement), key=lambda row: row.id):
+        rows = [row._mapping for row in rows]
+        course = {name: rows[0][name] for name in COURSE_COLUMNS}
+        course["sessions"] = [
+            {name: row[f"session_{name}"] for name in SESSION_COLUMNS}
+            for row in rows
+            if row["session_id"] is not None
+        ]
+        yield course
+
+
+def _iter_table(connection: Connection, table: Table, columns: Tuple[str, ...], since: Optional[datetime]) -> Iterator[Row]:
+    statement = select(*(table.c[name] for name in columns)).order_by(table.c.id)
+    if since is not None:
+        statement = statement.where(table.c.updated_at >= since)
+    for row in _stream(connection, statement):
+        yield dict(row._mapping)
+
+
+def iter_users(connection: Connection, since: Optional[datetime] = None) -> Iterator[Row]:
+    return _iter_table(connection, User.__table__, USER_COLUMNS, since)
+
+
+def iter_progress(connection: Connection, since: Optional[datetime] = None) -> Iterator[Row]:
+    return _iter_table(connection, UserProgress.__table__, PROGRESS_COLUMNS, since)
@@ -0,0 +1,156 @@
+"""Bulk upsert of courses and their sessions."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlmodel import Session
+
+from ..database import dialect_insert
+from ..models.entities import Ambience, Category, Course, CourseSession, Level
+from ..schemas.imports import CourseImportItem, CourseImportResult, ImportStatus
+from .rollups import rebuild_progress_rollups
+
+_UPSERT_COLUMNS = (
+    "description", "duration_minutes", "category_id", "level_id", "ambience_id",
+    "session_count", "sessions_total_minutes", "updated_at",
+)
+
+
+@dataclass
+class _References:
+    ids: Set[int]
+    names: Dict[str, int]
+    label: str
+
+    def resolve(self, ref_id: Optional[int], name: Optional[str]) -> Optional[int]:
+        if ref_id is not None:
+            if ref_id not in self.ids:
+                raise ValueError(f"Unknown {self.label} id {ref_id}")
+            return ref_id
+        if name is not None:
+            if name not in self.names:
+                raise ValueError(f"Unknown {self.label} '{name}'")
+            return self.names[name]
+        return None
+
+
+@dataclass
+class ReferenceLookup:
+    """Name and id index of the reference tables, loaded once per import."""
+
+    categories: _References
+    levels: _References
+    ambiances: _References
+
+
+def load_reference_lookup(session: Session) -> ReferenceLookup:
+    def index(model, label: str) -> _References:
+        rows = session.execute(select(model.id, model.name)).all()
+        return _References(ids={row.id for row in rows}, names={row.name: row.id for row in rows}, label=label)
+
+    return ReferenceLookup(
+        categories=index(Category, "category"),
+        levels=index(Level, "level"),
+        ambiances=index(Ambience, "ambience"),
+    )
+
+
+def _failure(index: int, title: Optional[str], detail: str) -> CourseImportResult:
+    return CourseImportResult(index=index, title=title, status=ImportStatus.FAILED, detail=detail)
+
+
+def failed_chunk(items: List[Tuple[int, Any]], detail: str) -> List[CourseImportResult]:
+    """Results reported when the transaction of a whole chunk was rolled back."""
+
+    return [
+        _failure(index, raw.get("title") if isinstance(raw, dict) else None, detail) for index, raw in items
+    ]
+
+
+def import_course_chunk(
+    session: Session, items: List[Tuple[int, Any]], references: ReferenceLookup
+) -> List[CourseImportResult]:
+    """Validate and upsert a chunk of raw import items in the session's transaction.
+
+    Courses are upserted on ``uq_courses_title`` with one multi-row
+    ``INSERT ... ON CONFLICT``; the sessions of updated courses are replaced
+    and all sessions of the chunk are written with a single executemany.
+    The caller owns the transaction.
+    """
+
+    results: Dict[int, CourseImportResult] = {}
+    pending: Dict[str, Tuple[int, Dict[str, Any], CourseImportItem]] = {}
+    for index, raw in items:
+        title = raw.get("title") if isinstance(raw, dict) else None
+        try:
+            item = CourseImportItem.parse_obj(raw)
+            values = {
+                "title": item.title,
+                "description": item.description,
+                "duration_minutes": item.duration_minutes,
+                "category_id": references.categories.resolve(item.category_id, item.category),
+                "level_id": references.levels.resolve(item.level_id, item.level),
+                "ambience_id": references.ambiances.resolve(item.ambience_id, item.ambience),
+                "session_count": len(item.sessions),
+                "sessions_total_minutes": sum(course_session.duration_minutes or 0 for course_session in item.sessions),
+            }
+        except ValueError as exc:
+            results[index] = _failure(index, title, str(exc))
+            continue
+        if item.title in pending:
+            previous = pending[item.title][0]
+            results[previous] = _failure(previous, item.title, f"Superseded by item {index} with the same title")
+        pending[item.title] = (index, values, item)
+
+    if not pending:
+        return [results[index] for index in sorted(results)]
+
+    now = datetime.utcnow()
+    courses = Course.__table__
+    course_sessions = CourseSession.__table__
+    titles = list(pending)
+    existing = {
+        row.title: (row.category_id, row.level_id)
+        for row in session.execute(
+            select(courses.c.title, courses.c.category_id, courses.c.level_id).where(courses.c.title.in_(titles))
+        )
+    }
+
+    statement = dialect_insert(session, courses).values(
+        [{**values, "created_at": now, "updated_at": now} for _, values, _ in pending.values()]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[courses.c.title],
+        set_={column: statement.excluded[column] for column in _UPSERT_COLUMNS},
+    )
+    course_ids = dict(session.execute(statement.returning(courses.c.title, courses.c.id)).all())
+
+    updated_ids = [course_ids[title] for title in titles if title in existing]
+    if updated_ids:
+        session.execute(delete(course_sessions).where(course_sessions.c.course_id.in_(updated_ids)))
+    session_rows = [
+        {**course_session.dict(), "course_id": course_ids[title], "created_at": now, "updated_at": now}
+        for title, (_, _, item) in pending.items()
+        for course_session in item.sessions
+    ]
+    if session_rows:
+        session.execute(insert(course_sessions), session_rows)
+    moved_ids = [
+        course_ids[title]
+        for title, (_, values, _) in pending.items()
+        if title in existing and existing[title] != (values["category_id"], values["level_id"])
+    ]
+    if moved_ids:
+        rebuild_progress_rollups(session, course_ids=moved_ids)
+
+    for title, (index, _, item) in pending.items():
+        results[index] = CourseImportResult(
+            index=index,
+            title=title,
+            status=ImportStatus.UPDATED if title in existing else ImportStatus.CREATED,
+            course_id=course_ids[title],
+            sessions=len(item.sessions),
+        )
+    return [results[index] for index in sorted(results)]
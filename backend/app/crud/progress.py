@@ -0,0 +1,430 @@
+"""Data access for user progress.
+
+Write helpers return the representation selected by :class:`ProgressView`:
+``None`` for ``minimal``, the :class:`ProgressCompact` fields of the progress
+row alone, or the fully loaded :class:`ProgressRead`. Representations are
+plain dicts built by :mod:`app.serializers`.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, func, or_, update
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import ColumnElement, Select
+from sqlmodel import Session, select
+
+from ..database import dialect_insert
+from ..heartbeats import heartbeat_buffer
+from ..models.entities import Course, ProgressStatus, UserProgress
+from ..reference_index import reference_index
+from ..schemas.progress import ProgressCompact, ProgressEvent, ProgressEventType, ProgressRead, ProgressView
+from ..serializers import Row, dump, dump_all
+from .rollups import RollupDeltas
+
+ProgressResult = Optional[Row]
+
+_progress = UserProgress.__table__
+_courses = Course.__table__
+_COMPACT_FIELDS = tuple(ProgressCompact.__fields__)
+
+# Most common previous status first: the write it guards usually matches.
+_STATUSES = (ProgressStatus.IN_PROGRESS, ProgressStatus.NOT_STARTED, ProgressStatus.COMPLETED)
+_WRITE_ATTEMPTS = 3
+
+# Rollup dimensions of the written row's course, returned by the same statement.
+_DIMENSIONS = (
+    select(_courses.c.category_id)
+    .where(_courses.c.id == _progress.c.course_id)
+    .correlate(_progress)
+    .scalar_subquery()
+    .label("category_id"),
+    select(_courses.c.level_id)
+    .where(_courses.c.id == _progress.c.course_id)
+    .correlate(_progress)
+    .scalar_subquery()
+    .label("level_id"),
+)
+
+_BATCH_COLUMNS = ("status", "total_listened_seconds", "started_at", "completed_at", "updated_at")
+
+_batch_update = (
+    update(_progress)
+    .where(_progress.c.id == bindparam("progress_id"))
+    .values(
+        status=bindparam("status"),
+        total_listened_seconds=bindparam("total_listened_seconds"),
+        started_at=bindparam("started_at"),
+        completed_at=bindparam("completed_at"),
+        updated_at=bindparam("updated_at"),
+    )
+)
+
+
+def progress_select() -> Select:
+    """Select progress rows, most recent first; run it with :func:`load_progresses`."""
+
+    return (
+        select(UserProgress)
+        .options(
+            selectinload(UserProgress.user),
+            selectinload(UserProgress.course).selectinload(Course.sessions),
+        )
+        .order_by(UserProgress.updated_at.desc())
+    )
+
+
+def load_progresses(session: Session, statement: Select) -> List[UserProgress]:
+    """Run a :func:`progress_select` statement and attach the course references from the in-memory index."""
+
+    progresses = session.exec(statement).unique().all()
+    reference_index.attach(session, {progress.course_id: progress.course for progress in progresses}.values())
+    return progresses
+
+
+def load_progress(session: Session, progress_id: int) -> UserProgress:
+    progresses = load_progresses(session, progress_select().where(UserProgress.id == progress_id))
+    if not progresses:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Progress not found")
+    return progresses[0]
+
+
+def list_user_progress(session: Session, user_id: int) -> List[Row]:
+    statement = progress_select().where(UserProgress.user_id == user_id)
+    return dump_all(ProgressRead, load_progresses(session, statement))
+
+
+def read_progress(session: Session, progress_id: int, user_id: int) -> Row:
+    progress = load_progress(session, progress_id)
+    if progress.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    return dump(ProgressRead, progress)
+
+
+def progress_result(session: Session, progress: Any, view: ProgressView) -> ProgressResult:
+    """Build the representation of a written progress.
+
+    ``progress`` is a progress row or a ``RETURNING`` row with its columns.
+    """
+
+    if view == ProgressView.MINIMAL:
+        return None
+    if view == ProgressView.COMPACT:
+        return dump(ProgressCompact, progress)
+    return dump(ProgressRead, load_progress(session, progress.id))
+
+
+def _update_owned(
+    session: Session,
+    progress_id: int,
+    user_id: int,
+    guards: Sequence[Tuple[ColumnElement, Optional[ProgressStatus], Dict[str, Any]]],
+) -> Tuple[ProgressStatus, Row]:
+    """Update a progress of ``user_id`` with one atomic ``UPDATE ... RETURNING``.
+
+    Rollups need the status the row had before the write. Each guard is a
+    ``(condition on the status, status it implies, values)`` triple; the first
+    matching statement tells that status without a prior read (``None`` when
+    the values keep the status, which ``RETURNING`` then gives). The first
+    guard covers the common case. Returns the previous status and the
+    written row, including its course's ``category_id`` and ``level_id``.
+    """
+
+    for _ in range(_WRITE_ATTEMPTS):
+        for condition, old_status, values in guards:
+            statement = (
+                update(_progress)
+                .where(_progress.c.id == progress_id, _progress.c.user_id == user_id, condition)
+                .values(**values)
+                .returning(*_progress.c, *_DIMENSIONS)
+            )
+            row = session.execute(statement).first()
+            if row is not None:
+                return old_status or row.status, row
+        exists = session.execute(
+            select(_progress.c.id).where(_progress.c.id == progress_id, _progress.c.user_id == user_id)
+        ).first()
+        if exists is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Progress not found")
+    # The row changed status between each of our statements; let the client retry.
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Progress updated concurrently")
+
+
+def start_course(session: Session, user_id: int, course_id: int, view: ProgressView) -> ProgressResult:
+    """Start or resume a course with an upsert on ``uq_progress_user_course``."""
+
+    course = session.execute(
+        select(_courses.c.category_id, _courses.c.level_id).where(_courses.c.id == course_id)
+    ).one_or_none()
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    now = datetime.utcnow()
+    statement = dialect_insert(session, _progress).values(
+        user_id=user_id,
+        course_id=course_id,
+        status=ProgressStatus.IN_PROGRESS,
+        total_listened_seconds=0,
+        started_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    set_ = {
+        "status": statement.excluded.status,
+        "started_at": func.coalesce(_progress.c.started_at, statement.excluded.started_at),
+        "updated_at": statement.excluded.updated_at,
+    }
+    for _ in range(_WRITE_ATTEMPTS):
+        # As in _update_owned, the conflict branch only updates a row in the
+        # expected status, so the previous status is known.
+        for old_status in _STATUSES:
+            upsert = statement.on_conflict_do_update(
+                index_elements=[_progress.c.user_id, _progress.c.course_id],
+                set_=set_,
+                where=_progress.c.status == old_status,
+            )
+            row = session.execute(upsert.returning(*_progress.c)).first()
+            if row is not None:
+                break
+        else:
+            continue
+        break
+    else:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Progress updated concurrently")
+    rollups = RollupDeltas()
+    created = row.created_at == now
+    rollups.add(
+        user_id, (course.category_id, course.level_id), None if created else old_status, ProgressStatus.IN_PROGRESS
+    )
+    rollups.apply(session)
+    session.commit()
+    return progress_result(session, row, view)
+
+
+def owns_progress(session: Session, progress_id: int, user_id: int) -> bool:
+    """Check ownership through the buffer's owner cache, reading the row on a miss."""
+
+    owner_id = heartbeat_buffer.owner_of(progress_id)
+    if owner_id is None:
+        owner_id = session.execute(select(UserProgress.user_id).where(UserProgress.id == progress_id)).scalar()
+        if owner_id is not None:
+            heartbeat_buffer.remember_owner(progress_id, owner_id)
+    return owner_id == user_id
+
+
+def buffer_listening(session: Session, progress_id: int, user_id: int, listened_seconds: int) -> int:
+    """Queue a heartbeat in the write-behind buffer after checking ownership.
+
+    Returns the seconds pending for the progress.
+    """
+
+    if not owns_progress(session, progress_id, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Progress not found")
+    return heartbeat_buffer.add(progress_id, listened_seconds)
+
+
+def log_listening(
+    session: Session, progress_id: int, user_id: int, listened_seconds: int, view: ProgressView
+) -> ProgressResult:
+    now = datetime.utcnow()
+    values = {"total_listened_seconds": _progress.c.total_listened_seconds + listened_seconds, "updated_at": now}
+    old_status, row = _update_owned(
+        session,
+        progress_id,
+        user_id,
+        [
+            (_progress.c.status != ProgressStatus.NOT_STARTED, None, values),
+            (
+                _progress.c.status == ProgressStatus.NOT_STARTED,
+                ProgressStatus.NOT_STARTED,
+                {
+                    **values,
+                    "status": ProgressStatus.IN_PROGRESS,
+                    "started_at": func.coalesce(_progress.c.started_at, now),
+                },
+            ),
+        ],
+    )
+    rollups = RollupDeltas()
+    rollups.add(user_id, (row.category_id, row.level_id), old_status, row.status, listened_seconds)
+    rollups.apply(session)
+    session.commit()
+    return progress_result(session, row, view)
+
+
+def complete_course(
+    session: Session, progress_id: int, user_id: int, listened_seconds: Optional[int], view: ProgressView
+) -> ProgressResult:
+    pending = heartbeat_buffer.drain(progress_id)
+    listened_seconds = (listened_seconds or 0) + pending
+    now = datetime.utcnow()
+    values = {
+        "total_listened_seconds": _progress.c.total_listened_seconds + listened_seconds,
+        "status": ProgressStatus.COMPLETED,
+        "started_at": func.coalesce(_progress.c.started_at, now),
+        "completed_at": now,
+        "updated_at": now,
+    }
+    try:
+        old_status, row = _update_owned(
+            session,
+            progress_id,
+            user_id,
+            [(_progress.c.status == expected, expected, values) for expected in _STATUSES],
+        )
+        rollups = RollupDeltas()
+        rollups.add(user_id, (row.category_id, row.level_id), old_status, ProgressStatus.COMPLETED, listened_seconds)
+        rollups.apply(session)
+        session.commit()
+    except Exception:
+        if pending:
+            heartbeat_buffer.add(progress_id, pending)
+        raise
+    return progress_result(session, row, view)
+
+
+def _event_failure(index: int, detail: str) -> Row:
+    return {"index": index, "status_code": status.HTTP_404_NOT_FOUND, "progress": None, "detail": detail}
+
+
+def _lock_user_progress(session: Session, user_id: int, *conditions: ColumnElement) -> List[Dict[str, Any]]:
+    statement = (
+        select(_progress)
+        .where(_progress.c.user_id == user_id, or_(*conditions))
+        .order_by(_progress.c.id)
+        .with_for_update()
+    )
+    return [dict(row) for row in session.execute(statement).mappings()]
+
+
+def apply_progress_batch(session: Session, user_id: int, events: List[ProgressEvent]) -> List[Row]:
+    """Replay progress events in order and commit them in one transaction.
+
+    The user's progress rows named by the events are read (and locked) with
+    one query. The rows the ``start`` events create are inserted first with
+    ``ON CONFLICT DO NOTHING``, as ``not_started`` placeholders, and the rows
+    started concurrently by another request are read back (and locked)
+    instead. The events are then applied in memory with the rules of
+    :func:`start_course`, :func:`log_listening` and :func:`complete_course`,
+    and the final states written with one executemany ``UPDATE`` and one
+    rollup upsert. Each event gets a result carrying the
+    :class:`ProgressCompact` fields as of that event, or a 404 when its course
+    or progress does not exist.
+    """
+
+    course_ids = {event.course_id for event in events if event.course_id is not None}
+    progress_ids = {event.progress_id for event in events if event.progress_id is not None}
+    conditions = []
+    if course_ids:
+        conditions.append(_progress.c.course_id.in_(course_ids))
+    if progress_ids:
+        conditions.append(_progress.c.id.in_(progress_ids))
+    states: Dict[int, Dict[str, Any]] = {
+        row["course_id"]: row for row in _lock_user_progress(session, user_id, *conditions)
+    }
+    dimensions = {
+        row.id: (row.category_id, row.level_id)
+        for row in session.execute(
+            select(_courses.c.id, _courses.c.category_id, _courses.c.level_id).where(
+                _courses.c.id.in_(course_ids | set(states))
+            )
+        )
+    }
+
+    now = datetime.utcnow()
+    started = {event.course_id for event in events if event.type == ProgressEventType.START}
+    to_create = sorted((started & set(dimensions)) - set(states))
+    created = set()
+    if to_create:
+        placeholders = [
+            {
+                "user_id": user_id,
+                "course_id": course_id,
+                "status": ProgressStatus.NOT_STARTED,
+                "total_listened_seconds": 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for course_id in to_create
+        ]
+        statement = dialect_insert(session, _progress).values(placeholders)
+        statement = statement.on_conflict_do_nothing(index_elements=[_progress.c.user_id, _progress.c.course_id])
+        for row in session.execute(statement.returning(*_progress.c)).mappings():
+            states[row["course_id"]] = dict(row)
+            created.add(row["course_id"])
+        conflicting = set(to_create) - created
+        if conflicting:
+            for row in _lock_user_progress(session, user_id, _progress.c.course_id.in_(conflicting)):
+                states[row["course_id"]] = row
+    initial = {
+        course_id: (state["status"], state["total_listened_seconds"])
+        for course_id, state in states.items()
+        if course_id not in created
+    }
+    course_of = {state["id"]: course_id for course_id, state in states.items() if course_id not in created}
+
+    results: List[Row] = []
+    drained: Dict[int, int] = {}
+    touched = set()
+    for index, event in enumerate(events):
+        if event.progress_id is None or event.type == ProgressEventType.START:
+            course_id = event.course_id
+        else:
+            course_id = course_of.get(event.progress_id)
+        state = states.get(course_id)
+        status_code = status.HTTP_200_OK
+        if event.type == ProgressEventType.START:
+            if state is None:
+                results.append(_event_failure(index, "Course not found"))
+                continue
+            if course_id in created and course_id not in touched:
+                status_code = status.HTTP_201_CREATED
+            state["status"] = ProgressStatus.IN_PROGRESS
+            state["started_at"] = state["started_at"] or now
+        elif state is None or (course_id in created and course_id not in touched):
+            results.append(_event_failure(index, "Progress not found"))
+            continue
+        elif event.type == ProgressEventType.LOG:
+            state["total_listened_seconds"] += event.listened_seconds
+            if state["status"] == ProgressStatus.NOT_STARTED:
+                state["status"] = ProgressStatus.IN_PROGRESS
+                state["started_at"] = state["started_at"] or now
+        else:
+            pending = heartbeat_buffer.drain(state["id"])
+            if pending:
+                drained[state["id"]] = drained.get(state["id"], 0) + pending
+            state["total_listened_seconds"] += (event.listened_seconds or 0) + pending
+            state["status"] = ProgressStatus.COMPLETED
+            state["started_at"] = state["started_at"] or now
+            state["completed_at"] = now
+        state["updated_at"] = now
+        touched.add(course_id)
+        progress = {field: state[field] for field in _COMPACT_FIELDS}
+        results.append({"index": index, "status_code": status_code, "progress": progress, "detail": None})
+
+    try:
+        changed = [
+            {"progress_id": states[course_id]["id"], **{column: states[course_id][column] for column in _BATCH_COLUMNS}}
+            for course_id in sorted(touched)
+        ]
+        if changed:
+            session.connection().execute(_batch_update, changed)
+        rollups = RollupDeltas()
+        for course_id in touched:
+            state = states[course_id]
+            old_status, old_seconds = initial.get(course_id, (None, 0))
+            rollups.add(
+                user_id,
+                dimensions[course_id],
+                old_status,
+                state["status"],
+                state["total_listened_seconds"] - old_seconds,
+            )
+        rollups.apply(session)
+        session.commit()
+    except Exception:
+        # The drained heartbeats belong to the rolled back transaction.
+        for progress_id, pending in drained.items():
+            heartbeat_buffer.add(progress_id, pending)
+        raise
+    return results
@@ -0,0 +1,47 @@
+"""Data access shared by the category, level and ambience endpoints."""
+
+from datetime import datetime
+from typing import List, Type, TypeVar
+
+from fastapi import HTTPException, status
+from sqlmodel import Session, SQLModel, select
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+
+def list_rows(session: Session, model: Type[ModelT], *order_by) -> List[ModelT]:
+    statement = select(model).order_by(*order_by)
+    return session.exec(statement).all()
+
+
+def get_row(session: Session, model: Type[ModelT], row_id: int, label: str) -> ModelT:
+    row = session.get(model, row_id)
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{label} not found")
+    return row
+
+
+def create_row(session: Session, model: Type[ModelT], payload: SQLModel) -> ModelT:
+    row = model(**payload.dict())
+    session.add(row)
+    session.commit()
+    session.refresh(row)
+    return row
+
+
+def update_row(session: Session, model: Type[ModelT], row_id: int, payload: SQLModel, label: str) -> ModelT:
+    row = get_row(session, model, row_id, label)
+    update_data = payload.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(row, key, value)
+    row.updated_at = datetime.utcnow()
+    session.add(row)
+    session.commit()
+    session.refresh(row)
+    return row
+
+
+def delete_row(session: Session, model: Type[ModelT], row_id: int, label: str) -> None:
+    row = get_row(session, model, row_id, label)
+    session.delete(row)
+    session.commit()
@@ -0,0 +1,173 @@
+"""Per-user progress rollups.
+
+Every progress row counts once in three :class:`ProgressRollup` rows of its
+user: the overall total, its course's category and its course's level.
+Progress writes record their status transition and listened seconds in a
+:class:`RollupDeltas` and apply them with one upsert in the same transaction;
+:func:`rebuild_progress_rollups` recomputes rollups from ``user_progress``.
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import case, delete, func, insert, literal, literal_column, select, union_all
+from sqlalchemy.sql import Select
+from sqlmodel import Session
+
+from ..database import dialect_insert
+from ..models.entities import Course, ProgressRollup, ProgressStatus, UserProgress
+from ..schemas.progress import ProgressBreakdown, ProgressCounts, ProgressSummary
+
+TOTAL = "total"
+CATEGORY = "category"
+LEVEL = "level"
+
+_STATUS_COLUMNS = {
+    ProgressStatus.NOT_STARTED: "not_started",
+    ProgressStatus.IN_PROGRESS: "in_progress",
+    ProgressStatus.COMPLETED: "completed",
+}
+_COUNTERS = (*_STATUS_COLUMNS.values(), "listened_seconds")
+
+_rollups = ProgressRollup.__table__
+_progress = UserProgress.__table__
+_courses = Course.__table__
+
+RollupKey = Tuple[int, str, int]
+
+
+def course_dimensions(session: Session, course_id: int) -> Tuple[Optional[int], Optional[int]]:
+    """Return the ``(category_id, level_id)`` a progress on ``course_id`` counts under."""
+
+    row = session.execute(
+        select(_courses.c.category_id, _courses.c.level_id).where(_courses.c.id == course_id)
+    ).one_or_none()
+    return (row.category_id, row.level_id) if row else (None, None)
+
+
+class RollupDeltas:
+    """Rollup changes accumulated for one transaction."""
+
+    def __init__(self) -> None:
+        self._deltas: Dict[RollupKey, Counter] = defaultdict(Counter)
+
+    def add(
+        self,
+        user_id: int,
+        dimensions: Tuple[Optional[int], Optional[int]],
+        old_status: Optional[ProgressStatus],
+        new_status: ProgressStatus,
+        listened_seconds: int = 0,
+    ) -> None:
+        """Record a progress moving from ``old_status`` (``None`` if new) to ``new_status``."""
+
+        if old_status == new_status and not listened_seconds:
+            return
+        category_id, level_id = dimensions
+        for key in ((user_id, TOTAL, 0), (user_id, CATEGORY, category_id or 0), (user_id, LEVEL, level_id or 0)):
+            delta = self._deltas[key]
+            if old_status is not None:
+                delta[_STATUS_COLUMNS[old_status]] -= 1
+            delta[_STATUS_COLUMNS[new_status]] += 1
+            delta["listened_seconds"] += listened_seconds
+
+    def apply(self, session: Session) -> None:
+        """Upsert the accumulated deltas; rows are written in key order to avoid deadlocks."""
+
+        if not self._deltas:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "dimension": dimension,
+                "key_id": key_id,
+                **{column: delta[column] for column in _COUNTERS},
+                "updated_at": now,
+            }
+            for (user_id, dimension, key_id), delta in sorted(self._deltas.items())
+        ]
+        statement = dialect_insert(session, _rollups)
+        statement = statement.on_conflict_do_update(
+            index_elements=[_rollups.c.user_id, _rollups.c.dimension, _rollups.c.key_id],
+            set_={
+                **{column: _rollups.c[column] + statement.excluded[column] for column in _COUNTERS},
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+        session.execute(statement, rows)
+        self._deltas.clear()
+
+
+def _rollup_select(dimension: str, key_column, users) -> Select:
+    key = literal_column("0") if key_column is None else func.coalesce(key_column, literal_column("0"))
+    counts = [
+        func.coalesce(func.sum(case((_progress.c.status == status, 1), else_=0)), 0).label(column)
+        for status, column in _STATUS_COLUMNS.items()
+    ]
+    statement = (
+        select(
+            _progress.c.user_id,
+            literal(dimension).label("dimension"),
+            key.label("key_id"),
+            *counts,
+            func.coalesce(func.sum(_progress.c.total_listened_seconds), 0).label("listened_seconds"),
+            literal(datetime.utcnow()).label("updated_at"),
+        )
+        .select_from(_progress.join(_courses, _courses.c.id == _progress.c.course_id))
+        .group_by(_progress.c.user_id, *([] if key_column is None else [key]))
+    )
+    if users is not None:
+        statement = statement.where(_progress.c.user_id.in_(users))
+    return statement
+
+
+def rebuild_progress_rollups(
+    session: Session,
+    user_ids: Optional[Union[Iterable[int], Select]] = None,
+    course_ids: Optional[Iterable[int]] = None,
+) -> None:
+    """Recompute the rollups of some users (all of them by default) in SQL.
+
+    ``user_ids`` may be a list or a ``SELECT`` of user ids; ``course_ids``
+    selects every user with a progress on those courses, e.g. after their
+    category or level changed. The caller commits.
+    """
+
+    users = None
+    if isinstance(user_ids, Select):
+        users = user_ids
+    elif user_ids is not None:
+        users = list(user_ids)
+    elif course_ids is not None:
+        users = select(_progress.c.user_id).where(_progress.c.course_id.in_(list(course_ids))).distinct()
+
+    cleanup = delete(_rollups)
+    if users is not None:
+        cleanup = cleanup.where(_rollups.c.user_id.in_(users))
+    session.execute(cleanup)
+    rows = union_all(
+        _rollup_select(TOTAL, None, users),
+        _rollup_select(CATEGORY, _courses.c.category_id, users),
+        _rollup_select(LEVEL, _courses.c.level_id, users),
+    )
+    columns = ["user_id", "dimension", "key_id", *_COUNTERS, "updated_at"]
+    session.execute(insert(_rollups).from_select(columns, rows))
+
+
+def read_progress_summary(session: Session, user_id: int) -> ProgressSummary:
+    """Build the progress summary of a user from their rollup rows alone."""
+
+    rows = session.execute(select(_rollups).where(_rollups.c.user_id == user_id)).all()
+    summary = ProgressSummary(totals=ProgressCounts())
+    breakdowns: Dict[str, List[ProgressBreakdown]] = {CATEGORY: summary.categories, LEVEL: summary.levels}
+    for row in rows:
+        counts = {column: row._mapping[column] for column in _COUNTERS}
+        if row.dimension == TOTAL:
+            summary.totals = ProgressCounts(**counts)
+        elif any(counts.values()):
+            breakdowns[row.dimension].append(ProgressBreakdown(id=row.key_id or None, **counts))
+    for breakdown in breakdowns.values():
+        breakdown.sort(key=lambda item: (item.id is None, item.id))
+    return summary
@@ -0,0 +1,37 @@
+"""Data access for users."""
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import case
+from sqlmodel import Session
+
+from ..database import dialect_insert
+from ..models.entities import User
+
+
+def upsert_user(session: Session, email: str, full_name: Optional[str]) -> Tuple[int, Optional[str]]:
+    """Provision or update a user in a single statement.
+
+    ``ON CONFLICT DO UPDATE`` makes concurrent first requests for the same
+    email converge on one row instead of failing on the unique constraint, and
+    ``RETURNING`` hands back the stored row in the same round trip.
+    """
+
+    users = User.__table__
+    now = datetime.utcnow()
+    statement = dialect_insert(session, users).values(
+        email=email, full_name=full_name, created_at=now, updated_at=now
+    )
+    if full_name:
+        changed = users.c.full_name.is_distinct_from(statement.excluded.full_name)
+        assignments = {
+            "full_name": statement.excluded.full_name,
+            "updated_at": case((changed, statement.excluded.updated_at), else_=users.c.updated_at),
+        }
+    else:
+        assignments = {"email": statement.excluded.email}
+    statement = statement.on_conflict_do_update(index_elements=[users.c.email], set_=assignments)
+    row = session.execute(statement.returning(users.c.id, users.c.full_name)).one()
+    session.commit()
+    return row.id, row.full_name
@@ -1,17 +1,91 @@
+import itertools
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.sql.dml import Insert
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .config import settings
+from .pool import pool_options
 
-engine = create_engine(settings.database_url, echo=False, pool_pre_ping=True)
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
 
 
-def init_db() -> None:
-    """Create database tables."""
+def async_database_url(url: str) -> str:
+    """Translate a sync connection string to its asyncio driver equivalent."""
 
-    SQLModel.metadata.create_all(engine)
+    parsed = make_url(url)
+    drivername = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if drivername is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Keyword arguments of ``create_engine`` built from the pool settings."""
+
+    parsed = make_url(url)
+    options: Dict[str, Any] = {"echo": False, "pool_pre_ping": settings.db_pool_pre_ping}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite needs its single shared connection.
+        return options
+    options.update(
+        pool_options(
+            size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            timeout=settings.db_pool_timeout,
+            recycle=settings.db_pool_recycle,
+            is_async=is_async,
+        )
+    )
+    if settings.db_statement_timeout_ms and parsed.get_backend_name() == "postgresql":
+        timeout = str(settings.db_statement_timeout_ms)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+
+async_engine: Optional[AsyncEngine] = None
+if settings.async_database:
+    _async_url = settings.async_database_url or async_database_url(settings.database_url)
+    async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+
+replica_urls: List[str] = [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+replica_engines: List[Engine] = [create_engine(url, **engine_options(url)) for url in replica_urls]
+async_replica_engines: List[AsyncEngine] = []
+if settings.async_database:
+    async_replica_engines = [
+        create_async_engine(async_database_url(url), **engine_options(async_database_url(url), is_async=True))
+        for url in replica_urls
+    ]
+_replica_turns = itertools.count()
+
+
+def read_engine(primary: bool = False) -> Engine:
+    """Engine serving a read-only request: the replicas in turn, else the primary."""
+
+    if primary or not replica_engines:
+        return engine
+    return replica_engines[next(_replica_turns) % len(replica_engines)]
+
+
+def async_read_engine(primary: bool = False) -> AsyncEngine:
+    """Asyncio counterpart of :func:`read_engine`."""
+
+    if async_engine is None:
+        raise RuntimeError("The async database engine is disabled; set ASYNC_DATABASE=true")
+    if primary or not async_replica_engines:
+        return async_engine
+    return async_replica_engines[next(_replica_turns) % len(async_replica_engines)]
 
 
 @contextmanager
@@ -34,3 +108,23 @@ def get_session() -> Iterator[Session]:
 
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency returning an asyncio database session."""
+
+    if async_engine is None:
+        raise RuntimeError("The async database engine is disabled; set ASYNC_DATABASE=true")
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+def dialect_insert(session: Session, table: Table) -> Insert:
+    """Return an ``INSERT`` supporting ``ON CONFLICT`` for the session's database."""
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
@@ -0,0 +1,307 @@
+"""Deterministic synthetic dataset generator for load testing.
+
+Builds production-sized catalogs and user histories far faster than
+:mod:`seeds`: rows are generated lazily from a seeded RNG and written in large
+batches, with PostgreSQL ``COPY`` when available and multi-row inserts
+elsewhere (SQLite). Run ``python -m backend.app.datagen --help`` for options.
+"""
+
+import argparse
+import csv
+import io
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session
+
+from .crud.rollups import rebuild_progress_rollups
+from .migrations import upgrade
+from .models.entities import (
+    Ambience,
+    Category,
+    Course,
+    CourseSession,
+    Level,
+    ProgressRollup,
+    ProgressStatus,
+    User,
+    UserProgress,
+)
+from .search import bulk_load
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50_000
+EPOCH = datetime(2024, 1, 1)
+
+_WORDS = (
+    "respiration", "méditation", "cohérence", "cardiaque", "ancrage", "sommeil", "énergie", "calme",
+    "souffle", "détente", "attention", "gratitude", "marche", "corps", "pensées", "matinale",
+)
+_STATUSES = (
+    (ProgressStatus.IN_PROGRESS, 0.7),
+    (ProgressStatus.COMPLETED, 0.2),
+    (ProgressStatus.NOT_STARTED, 0.1),
+)
+
+
+@dataclass
+class DatasetSpec:
+    """Row counts of a generated dataset."""
+
+    courses: int = 100
+    sessions: int = 1_000
+    users: int = 1_000
+    progress: int = 10_000
+    categories: int = 12
+    levels: int = 4
+    ambiances: int = 8
+    seed: int = 42
+
+
+def _batched(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _csv_value(value: Any) -> Any:
+    return value.name if isinstance(value, Enum) else value
+
+
+def _write_rows(connection: Connection, table: Table, columns: Sequence[str], rows: Iterable[Tuple]) -> int:
+    """Stream ``rows`` into ``table`` and return the number written."""
+
+    written = 0
+    if connection.dialect.name == "postgresql":
+        quote = connection.dialect.identifier_preparer.quote
+        statement = f"COPY {quote(table.name)} ({', '.join(map(quote, columns))}) FROM STDIN WITH (FORMAT csv)"
+        cursor = connection.connection.dbapi_connection.cursor()
+        for batch in _batched(rows, BATCH_SIZE):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows([tuple(map(_csv_value, row)) for row in batch])
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            written += len(batch)
+        cursor.close()
+    else:
+        insert = table.insert()
+        for batch in _batched(rows, BATCH_SIZE):
+            connection.execute(insert, [dict(zip(columns, row)) for row in batch])
+            written += len(batch)
+    logger.info("Wrote %d rows into %s", written, table.name)
+    return written
+
+
+def _rng(spec: DatasetSpec, name: str) -> random.Random:
+    return random.Random(f"{spec.seed}:{name}")
+
+
+def _timestamp(rng: random.Random) -> datetime:
+    return EPOCH + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+
+def _phrase(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _split(total: int, parts: int) -> Iterator[int]:
+    """Spread ``total`` over ``parts`` buckets as evenly as possible."""
+
+    base, remainder = divmod(total, parts) if parts else (0, 0)
+    for index in range(parts):
+        yield base + (1 if index < remainder else 0)
+
+
+def _next_id(connection: Connection, table: Table) -> int:
+    return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _reset(connection: Connection) -> None:
+    tables = [ProgressRollup, UserProgress, User, CourseSession, Course, Category, Level, Ambience]
+    if connection.dialect.name == "postgresql":
+        names = ", ".join(model.__tablename__ for model in tables)
+        connection.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+    else:
+        for model in tables:
+            connection.execute(model.__table__.delete())
+
+
+def _sync_sequences(connection: Connection) -> None:
+    if connection.dialect.name != "postgresql":
+        return
+    for model in (Category, Level, Ambience, Course, CourseSession, User, UserProgress):
+        name = model.__tablename__
+        connection.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE((SELECT max(id) FROM {name}), 1))")
+        )
+
+
+def _reference_rows(spec: DatasetSpec, label: str, count: int, first_id: int) -> Iterator[Tuple]:
+    rng = _rng(spec, label)
+    for offset in range(count):
+        now = _timestamp(rng)
+        yield first_id + offset, f"{label} {first_id + offset}", _phrase(rng, 6), now, now
+
+
+def _course_rows(spec: DatasetSpec, first_id: int, refs: Tuple[List[int], List[int], List[int]]) -> Iterator[Tuple]:
+    rng = _rng(spec, "courses")
+    categories, levels, ambiances = refs
+    for offset, session_count in enumerate(_split(spec.sessions, spec.courses)):
+        course_id = first_id + offset
+        now = _timestamp(rng)
+        yield (
+            course_id,
+            f"{_phrase(rng, 3).capitalize()} {course_id}",
+            _phrase(rng, 20),
+            session_count * 10,
+            session_count,
+            session_count * 10,
+            rng.choice(categories) if categories else None,
+            rng.choice(levels) if levels else None,
+            rng.choice(ambiances) if ambiances else None,
+            now,
+            now,
+        )
+
+
+def _session_rows(spec: DatasetSpec, first_course_id: int) -> Iterator[Tuple]:
+    rng = _rng(spec, "sessions")
+    for offset, session_count in enumerate(_split(spec.sessions, spec.courses)):
+        for order in range(1, session_count + 1):
+            now = _timestamp(rng)
+            yield first_course_id + offset, _phrase(rng, 3).capitalize(), _phrase(rng, 12), order, 10, now, now
+
+
+def _user_rows(spec: DatasetSpec, first_id: int) -> Iterator[Tuple]:
+    rng = _rng(spec, "users")
+    for user_id in range(first_id, first_id + spec.users):
+        now = _timestamp(rng)
+        yield user_id, f"user{user_id}@load.test", f"Utilisateur {user_id}", now, now
+
+
+def _progress_rows(spec: DatasetSpec, first_user_id: int, first_course_id: int) -> Iterator[Tuple]:
+    rng = _rng(spec, "progress")
+    statuses = [status for status, _ in _STATUSES]
+    weights = [weight for _, weight in _STATUSES]
+    per_user = _split(min(spec.progress, spec.users * spec.courses), spec.users)
+    for offset, count in enumerate(per_user):
+        start = rng.randrange(spec.courses) if spec.courses else 0
+        for step in range(count):
+            status = rng.choices(statuses, weights)[0]
+            updated_at = _timestamp(rng)
+            started_at = None if status == ProgressStatus.NOT_STARTED else updated_at - timedelta(days=1)
+            completed_at = updated_at if status == ProgressStatus.COMPLETED else None
+            listened = 0 if status == ProgressStatus.NOT_STARTED else rng.randrange(60, 3600)
+            yield (
+                first_user_id + offset,
+                first_course_id + (start + step) % spec.courses,
+                status,
+                listened,
+                started_at,
+                completed_at,
+                updated_at,
+                updated_at,
+            )
+
+
+def generate_dataset(engine: Engine, spec: DatasetSpec, reset: bool = False) -> DatasetSpec:
+    """Populate ``engine`` with the rows described by ``spec``.
+
+    The same spec always produces the same data. Without ``reset`` the rows
+    are appended after the existing ones; reference tables are only filled
+    when they are empty.
+    """
+
+    upgrade(engine)
+    started = time.perf_counter()
+    with engine.begin() as connection, bulk_load(connection):
+        if reset:
+            _reset(connection)
+
+        refs = []
+        for model, label, count in (
+            (Category, "Catégorie", spec.categories),
+            (Level, "Niveau", spec.levels),
+            (Ambience, "Ambiance", spec.ambiances),
+        ):
+            table = model.__table__
+            ids = list(connection.execute(select(table.c.id).order_by(table.c.id)).scalars())
+            if not ids:
+                first_id = _next_id(connection, table)
+                columns = ("id", "name", "description", "created_at", "updated_at")
+                _write_rows(connection, table, columns, _reference_rows(spec, label, count, first_id))
+                ids = list(range(first_id, first_id + count))
+            refs.append(ids)
+
+        first_course_id = _next_id(connection, Course.__table__)
+        _write_rows(
+            connection,
+            Course.__table__,
+            (
+                "id", "title", "description", "duration_minutes", "session_count", "sessions_total_minutes",
+                "category_id", "level_id", "ambience_id", "created_at", "updated_at",
+            ),
+            _course_rows(spec, first_course_id, tuple(refs)),
+        )
+        _write_rows(
+            connection,
+            CourseSession.__table__,
+            ("course_id", "title", "description", "order", "duration_minutes", "created_at", "updated_at"),
+            _session_rows(spec, first_course_id),
+        )
+        first_user_id = _next_id(connection, User.__table__)
+        _write_rows(
+            connection,
+            User.__table__,
+            ("id", "email", "full_name", "created_at", "updated_at"),
+            _user_rows(spec, first_user_id),
+        )
+        if spec.courses:
+            _write_rows(
+                connection,
+                UserProgress.__table__,
+                (
+                    "user_id", "course_id", "status", "total_listened_seconds", "started_at", "completed_at",
+                    "created_at", "updated_at",
+                ),
+                _progress_rows(spec, first_user_id, first_course_id),
+            )
+            new_users = select(User.__table__.c.id).where(User.__table__.c.id >= first_user_id)
+            rebuild_progress_rollups(Session(bind=connection), user_ids=new_users)
+        _sync_sequences(connection)
+    logger.info("Generated dataset %s in %.1fs", asdict(spec), time.perf_counter() - started)
+    return spec
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = DatasetSpec()
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field}", type=int, default=value)
+    parser.add_argument("--reset", action="store_true", help="Delete every existing row first")
+    parser.add_argument("--database-url", help="Target database (defaults to DATABASE_URL)")
+    args = vars(parser.parse_args(argv))
+    reset = args.pop("reset")
+    database_url = args.pop("database_url")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if database_url:
+        from sqlalchemy import create_engine
+
+        engine = create_engine(database_url)
+    else:
+        from .database import engine
+    generate_dataset(engine, DatasetSpec(**args), reset=reset)
+
+
+if __name__ == "__main__":
+    main()
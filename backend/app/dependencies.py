@@ -1,12 +1,20 @@
-from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional, Tuple
 
-from fastapi import Depends, Header, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import Depends, Header, HTTPException, Request, status
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from .cache import LRUCache
 from .config import settings
-from .database import get_session
+from .crud.users import upsert_user
+from .database import async_read_engine, engine, get_async_session, get_session, read_engine
 from .models.entities import User
+from .replicas import reads_from_primary
+
+_user_cache = LRUCache(
+    max_entries=settings.user_cache_max_entries,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
 
 
 async def require_admin(x_admin_token: str = Header(..., alias="X-Admin-Token")) -> None:
@@ -16,35 +24,79 @@ async def require_admin(x_admin_token: str = Header(..., alias="X-Admin-Token"))
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
 
 
-def _update_user_timestamp(user: User) -> None:
-    user.updated_at = datetime.utcnow()
+def get_read_session(request: Request) -> Iterator[Session]:
+    """FastAPI dependency returning a session for read-only endpoints.
+
+    Queries go to a replica when some are configured, except for callers who
+    wrote recently (see :mod:`app.replicas`).
+    """
+
+    primary = reads_from_primary(request.headers.get("X-User-Email"), request.cookies)
+    with Session(read_engine(primary)) as session:
+        yield session
+
+
+async def get_async_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Async counterpart of :func:`get_read_session`."""
+
+    primary = reads_from_primary(request.headers.get("X-User-Email"), request.cookies)
+    async with AsyncSession(async_read_engine(primary)) as session:
+        yield session
+
+
+def _cached_user(email: str, full_name: Optional[str]) -> Optional[Tuple[int, Optional[str]]]:
+    cached = _user_cache.get(email)
+    if cached is None or (full_name and cached[1] != full_name):
+        return None
+    return cached
+
+
+def authenticate(email: str, full_name: Optional[str] = None) -> User:
+    """Resolve a user outside of a request, e.g. once per WebSocket connection.
 
+    Blocking on a cache miss: call it from a worker thread.
+    """
 
-async def get_current_user(
+    cached = _cached_user(email, full_name)
+    if cached is None:
+        with Session(engine) as session:
+            cached = upsert_user(session, email, full_name)
+        _user_cache.set(email, cached)
+    user_id, stored_name = cached
+    return User(id=user_id, email=email, full_name=stored_name)
+
+
+def get_current_user(
     session: Session = Depends(get_session),
     x_user_email: str = Header(..., alias="X-User-Email"),
     x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
 ) -> User:
-    """Retrieve the current user based on request headers."""
-
-    statement = select(User).where(User.email == x_user_email)
-    user = session.exec(statement).first()
-    if user is None:
-        user = User(email=x_user_email, full_name=x_user_name)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        return user
-
-    updated = False
-    if x_user_name and user.full_name != x_user_name:
-        user.full_name = x_user_name
-        updated = True
-
-    if updated:
-        _update_user_timestamp(user)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-
-    return user
+    """Retrieve the current user based on request headers.
+
+    Resolved users are cached by email so most requests skip the database.
+    The returned instance is detached and only meant to identify the caller.
+    This is a sync dependency so a cache miss blocks a threadpool worker,
+    not the event loop.
+    """
+
+    cached = _cached_user(x_user_email, x_user_name)
+    if cached is None:
+        cached = upsert_user(session, x_user_email, x_user_name)
+        _user_cache.set(x_user_email, cached)
+    user_id, full_name = cached
+    return User(id=user_id, email=x_user_email, full_name=full_name)
+
+
+async def get_current_user_async(
+    session: AsyncSession = Depends(get_async_session),
+    x_user_email: str = Header(..., alias="X-User-Email"),
+    x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
+) -> User:
+    """Async counterpart of :func:`get_current_user` used by the async routers."""
+
+    cached = _cached_user(x_user_email, x_user_name)
+    if cached is None:
+        cached = await session.run_sync(upsert_user, x_user_email, x_user_name)
+        _user_cache.set(x_user_email, cached)
+    user_id, full_name = cached
+    return User(id=user_id, email=x_user_email, full_name=full_name)
@@ -0,0 +1,152 @@
+"""Query plans of the hot query shapes.
+
+:func:`explain_hot_queries` runs ``EXPLAIN`` (PostgreSQL) or ``EXPLAIN QUERY
+PLAN`` (SQLite) on the statements behind the catalog and progress endpoints,
+with parameters sampled from the database, and flags the tables read by a
+full scan. Exposed by ``GET /admin/explain`` and
+``python -m backend.app.maintenance explain``. Plans depend on table sizes
+and statistics: check them on a database of production scale.
+"""
+
+import re
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from .crud.courses import course_select
+from .crud.progress import progress_select
+from .models.entities import Course, CourseSession, ProgressRollup, UserProgress
+from .schemas.explain import QueryPlan
+
+PAGE_LIMIT = 51
+
+_FULL_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"^SCAN (\w+)(?: AS \w+)?$"),
+}
+
+
+class Samples(NamedTuple):
+    """Existing ids and values the explained statements are bound to."""
+
+    user_id: int
+    course_id: int
+    course_title: str
+    category_id: int
+    level_id: int
+
+
+class HotQuery(NamedTuple):
+    name: str
+    description: str
+    build: Callable[[Samples], Select]
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery(
+        "progress_me",
+        "GET /progress/me: a user's progress, most recently updated first",
+        lambda s: progress_select().where(UserProgress.user_id == s.user_id),
+    ),
+    HotQuery(
+        "progress_user_course",
+        "POST /progress/start: conflict target of the upsert on uq_progress_user_course",
+        lambda s: select(UserProgress).where(UserProgress.user_id == s.user_id, UserProgress.course_id == s.course_id),
+    ),
+    HotQuery(
+        "progress_by_course",
+        "Rollup rebuild after a course changes category or level",
+        lambda s: select(UserProgress.user_id).where(UserProgress.course_id == s.course_id).distinct(),
+    ),
+    HotQuery(
+        "progress_summary",
+        "GET /progress/me/summary: rollup rows of a user",
+        lambda s: select(ProgressRollup).where(ProgressRollup.user_id == s.user_id),
+    ),
+    HotQuery(
+        "catalog_page",
+        "GET /courses/: next keyset page after a cursor",
+        lambda s: course_select(with_sessions=False)
+        .where(tuple_(Course.title, Course.id) > tuple_(s.course_title, s.course_id))
+        .limit(PAGE_LIMIT),
+    ),
+    HotQuery(
+        "catalog_by_category",
+        "GET /courses/?category_id=: first page of a category",
+        lambda s: course_select(with_sessions=False).where(Course.category_id == s.category_id).limit(PAGE_LIMIT),
+    ),
+    HotQuery(
+        "catalog_by_level",
+        "GET /courses/?level_id=: first page of a level",
+        lambda s: course_select(with_sessions=False).where(Course.level_id == s.level_id).limit(PAGE_LIMIT),
+    ),
+    HotQuery(
+        "course_sessions",
+        "selectinload(Course.sessions): sessions of the courses of a page",
+        lambda s: select(CourseSession).where(CourseSession.course_id.in_([s.course_id])),
+    ),
+]
+
+
+def sample_parameters(connection: Connection) -> Samples:
+    """Pick the busiest user and an existing course, category and level."""
+
+    user_id = connection.execute(
+        select(UserProgress.user_id).group_by(UserProgress.user_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    course = connection.execute(select(Course.id, Course.title).order_by(Course.title, Course.id).limit(1)).first()
+    category_id = connection.execute(select(func.min(Course.category_id))).scalar()
+    level_id = connection.execute(select(func.min(Course.level_id))).scalar()
+    return Samples(
+        user_id=user_id or 0,
+        course_id=course.id if course else 0,
+        course_title=course.title if course else "",
+        category_id=category_id or 0,
+        level_id=level_id or 0,
+    )
+
+
+def render_statement(connection: Connection, statement: Select) -> str:
+    """Render ``statement`` for the connection's dialect with its parameters inlined."""
+
+    return str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain_statement(connection: Connection, sql: str, analyze: bool = False) -> List[str]:
+    """Return the plan of the rendered statement ``sql`` as text lines."""
+
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    elif dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        raise NotImplementedError(f"EXPLAIN is not supported on {dialect}")
+    rows = connection.execution_options(no_parameters=True).exec_driver_sql(prefix + sql).all()
+    return [row[-1] for row in rows]
+
+
+def explain_hot_queries(connection: Connection, analyze: bool = False, names: Optional[List[str]] = None) -> List[QueryPlan]:
+    """Explain every hot query (or those in ``names``)."""
+
+    samples = sample_parameters(connection)
+    full_scan = _FULL_SCAN.get(connection.dialect.name)
+    plans = []
+    for query in HOT_QUERIES:
+        if names and query.name not in names:
+            continue
+        sql = render_statement(connection, query.build(samples))
+        lines = explain_statement(connection, sql, analyze)
+        matches = [full_scan.search(line.strip()) for line in lines] if full_scan else []
+        plans.append(
+            QueryPlan(
+                name=query.name,
+                description=query.description,
+                statement=sql,
+                plan=lines,
+                full_scans=sorted({match.group(1) for match in matches if match}),
+            )
+        )
+    return plans
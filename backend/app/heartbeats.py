@@ -0,0 +1,159 @@
+"""Write-behind buffer coalescing listening heartbeats.
+
+When ``HEARTBEAT_WRITE_BEHIND`` is enabled, ``POST /progress/{id}/log`` only
+records the listened seconds in memory. Increments for the same progress row
+are merged and written periodically (or once the buffer grows past its size
+threshold) with a single executemany ``UPDATE`` that adds the deltas in SQL.
+The ``/progress/ws`` WebSocket always goes through this buffer, so the
+flusher runs in every worker.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, case, func, literal, select, update
+from sqlmodel import Session
+
+from .cache import LRUCache
+from .config import settings
+from .crud.rollups import RollupDeltas
+from .database import engine
+from .models.entities import Course, ProgressStatus, UserProgress
+
+logger = logging.getLogger(__name__)
+
+_progress = UserProgress.__table__
+_courses = Course.__table__
+
+_flush_statement = (
+    update(_progress)
+    .where(_progress.c.id == bindparam("progress_id"))
+    .values(
+        total_listened_seconds=_progress.c.total_listened_seconds + bindparam("delta"),
+        status=case(
+            # Typed literal so the enum is stored by name, as the ORM does.
+            (
+                _progress.c.status == ProgressStatus.NOT_STARTED,
+                literal(ProgressStatus.IN_PROGRESS, _progress.c.status.type),
+            ),
+            else_=_progress.c.status,
+        ),
+        started_at=func.coalesce(_progress.c.started_at, bindparam("now")),
+        updated_at=bindparam("now"),
+    )
+)
+
+
+class HeartbeatBuffer:
+    """Accumulate listened seconds per progress id and flush them in bulk."""
+
+    def __init__(self, flush_interval_seconds: float, max_pending: int) -> None:
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self._pending: Dict[int, int] = {}
+        self._owners = LRUCache(max_entries=100_000)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def owner_of(self, progress_id: int) -> Optional[int]:
+        """Return the user owning ``progress_id`` if it was already verified."""
+
+        return self._owners.get(progress_id)
+
+    def remember_owner(self, progress_id: int, user_id: int) -> None:
+        self._owners.set(progress_id, user_id)
+
+    def add(self, progress_id: int, seconds: int) -> int:
+        """Buffer ``seconds`` for ``progress_id`` and return the pending total."""
+
+        with self._lock:
+            pending = self._pending.get(progress_id, 0) + seconds
+            self._pending[progress_id] = pending
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+        return pending
+
+    def drain(self, progress_id: int) -> int:
+        """Remove and return the seconds still pending for ``progress_id``."""
+
+        with self._lock:
+            return self._pending.pop(progress_id, 0)
+
+    def flush(self) -> int:
+        """Write every pending increment; return the number of rows updated."""
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            now = datetime.utcnow()
+            params = [
+                {"progress_id": progress_id, "delta": delta, "now": now}
+                for progress_id, delta in pending.items()
+            ]
+            try:
+                with Session(engine) as session:
+                    rollups = self._rollup_deltas(session, pending)
+                    session.connection().execute(_flush_statement, params)
+                    rollups.apply(session)
+                    session.commit()
+            except Exception:
+                logger.exception("Failed to flush %d listening heartbeats, retrying later", len(params))
+                with self._lock:
+                    for progress_id, delta in pending.items():
+                        self._pending[progress_id] = self._pending.get(progress_id, 0) + delta
+                return 0
+            return len(params)
+
+    @staticmethod
+    def _rollup_deltas(session: Session, pending: Dict[int, int]) -> RollupDeltas:
+        """Read (and lock) the flushed rows to derive their rollup changes."""
+
+        rows = session.execute(
+            select(_progress.c.id, _progress.c.user_id, _progress.c.status, _courses.c.category_id, _courses.c.level_id)
+            .join(_courses, _courses.c.id == _progress.c.course_id)
+            .where(_progress.c.id.in_(list(pending)))
+            .order_by(_progress.c.id)
+            .with_for_update(of=_progress)
+        ).all()
+        rollups = RollupDeltas()
+        for row in rows:
+            new_status = ProgressStatus.IN_PROGRESS if row.status == ProgressStatus.NOT_STARTED else row.status
+            rollups.add(row.user_id, (row.category_id, row.level_id), row.status, new_status, pending[row.id])
+        return rollups
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="heartbeat-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flusher and write whatever is still buffered."""
+
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+heartbeat_buffer = HeartbeatBuffer(
+    flush_interval_seconds=settings.heartbeat_flush_interval_seconds,
+    max_pending=settings.heartbeat_flush_max_pending,
+)
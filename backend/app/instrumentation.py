@@ -0,0 +1,136 @@
+"""Opt-in per-request SQL instrumentation.
+
+When ``SQL_INSTRUMENTATION`` is enabled, engine events time every statement
+and attribute it to the request being served through a context variable (the
+context follows sync handlers into the threadpool and async sessions into
+their greenlets). :class:`SQLInstrumentationMiddleware` reports the totals in
+a ``Server-Timing`` header, logs the slowest statements and warns when the
+same statement shape runs many times in one request, the usual sign of an
+N+1 query.
+"""
+
+import heapq
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize ``statement`` so executions differing only by IN-list size match."""
+
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", statement)).strip()
+
+
+class RequestStats:
+    """SQL statements executed while serving one request."""
+
+    def __init__(self, slow_statements: int) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self._slow_statements = slow_statements
+        self._slowest: List[Tuple[float, int, str]] = []
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+        entry = (duration, self.count, statement)
+        if len(self._slowest) < self._slow_statements:
+            heapq.heappush(self._slowest, entry)
+        elif self._slowest and duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        return [(duration, statement) for duration, _, statement in sorted(self._slowest, reverse=True)]
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        slowest = max(self._slowest)[0] if self._slowest else 0.0
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} statements", '
+            f"db-slowest;dur={slowest * 1000:.2f}"
+        )
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("sql_request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Return the statistics of the request being served, if instrumented."""
+
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("sql_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = conn.info.get("sql_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the timing listeners to ``engine`` (pass ``AsyncEngine.sync_engine``)."""
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLInstrumentationMiddleware:
+    """ASGI middleware collecting and reporting the SQL issued by each request."""
+
+    def __init__(self, app: Any, slow_statements: int = 3, repeated_threshold: int = 5) -> None:
+        self.app = app
+        self.slow_statements = slow_statements
+        self.repeated_threshold = repeated_threshold
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(self.slow_statements)
+        token = _current.set(stats)
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope, stats: RequestStats) -> None:
+        if not stats.count:
+            return
+        route = f"{scope['method']} {scope['path']}"
+        logger.info("%s: %d SQL statements in %.2fms", route, stats.count, stats.duration * 1000)
+        for duration, statement in stats.slowest:
+            logger.info("%s: slow statement (%.2fms): %s", route, duration * 1000, statement_shape(statement))
+        for shape, count in stats.repeated(self.repeated_threshold):
+            logger.warning("%s: statement executed %d times, likely N+1: %s", route, count, shape)
@@ -0,0 +1,116 @@
+"""Incremental parsers turning a byte stream into JSON items.
+
+Both parsers accept arbitrary chunk boundaries (including inside a UTF-8
+sequence) and only keep the current, not yet complete item in memory.
+"""
+
+import codecs
+import json
+from typing import Any, List
+
+MAX_ITEM_BYTES = 1024 * 1024
+
+_WHITESPACE = " \t\r\n"
+_BLANK = object()
+
+
+class JSONStreamError(ValueError):
+    """Raised when the stream is not a valid JSON array / NDJSON document."""
+
+
+class NDJSONParser:
+    """Parse newline-delimited JSON, one item per non-blank line."""
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._line = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._buffer += self._decoder.decode(chunk)
+        *lines, self._buffer = self._buffer.split("\n")
+        if len(self._buffer) > MAX_ITEM_BYTES:
+            raise JSONStreamError(f"Line {self._line + len(lines) + 1} exceeds {MAX_ITEM_BYTES} bytes")
+        return [item for item in map(self._parse, lines) if item is not _BLANK]
+
+    def close(self) -> List[Any]:
+        self._buffer += self._decoder.decode(b"", final=True)
+        line, self._buffer = self._buffer, ""
+        item = self._parse(line)
+        return [] if item is _BLANK else [item]
+
+    def _parse(self, line: str) -> Any:
+        self._line += 1
+        if not line.strip():
+            return _BLANK
+        try:
+            return json.loads(line)
+        except ValueError as exc:
+            raise JSONStreamError(f"Invalid JSON on line {self._line}: {exc}") from exc
+
+
+class JSONArrayParser:
+    """Parse the elements of a top-level JSON array as they arrive."""
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        self._expect_item = True
+        self._count = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._buffer += self._decoder.decode(chunk)
+        items = self._drain(final=False)
+        if len(self._buffer) > MAX_ITEM_BYTES:
+            raise JSONStreamError(f"Array element exceeds {MAX_ITEM_BYTES} bytes")
+        return items
+
+    def close(self) -> List[Any]:
+        self._buffer += self._decoder.decode(b"", final=True)
+        items = self._drain(final=True)
+        if not self._finished:
+            raise JSONStreamError("Unexpected end of JSON array")
+        return items
+
+    def _drain(self, final: bool) -> List[Any]:
+        items: List[Any] = []
+        buffer = self._buffer.lstrip(_WHITESPACE)
+        while buffer:
+            if self._finished:
+                raise JSONStreamError("Unexpected data after the end of the JSON array")
+            if not self._started:
+                if buffer[0] != "[":
+                    raise JSONStreamError("Expected a JSON array")
+                self._started = True
+                buffer = buffer[1:].lstrip(_WHITESPACE)
+                continue
+            if buffer[0] == "]":
+                if self._expect_item and self._count:
+                    raise JSONStreamError("Trailing ',' before the end of the JSON array")
+                self._finished = True
+                buffer = buffer[1:].lstrip(_WHITESPACE)
+                continue
+            if not self._expect_item:
+                if buffer[0] != ",":
+                    raise JSONStreamError("Expected ',' between array elements")
+                self._expect_item = True
+                buffer = buffer[1:].lstrip(_WHITESPACE)
+                continue
+            try:
+                item, end = self._json.raw_decode(buffer)
+            except ValueError as exc:
+                if final:
+                    raise JSONStreamError(f"Invalid JSON array element: {exc}") from exc
+                break
+            if end == len(buffer) and not final and not isinstance(item, (dict, list)):
+                # A scalar at the end of the buffer may still be truncated.
+                break
+            items.append(item)
+            self._count += 1
+            self._expect_item = False
+            buffer = buffer[end:].lstrip(_WHITESPACE)
+        self._buffer = buffer
+        return items
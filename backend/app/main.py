@@ -1,10 +1,24 @@
-from fastapi import FastAPI
+import logging
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from .config import settings
-from .database import init_db
-from .routers import ambiances, categories, courses, levels, progress
+from .database import async_engine, async_replica_engines, engine, replica_engines
+from .heartbeats import heartbeat_buffer
+from .instrumentation import SQLInstrumentationMiddleware, instrument_engine
+from .migrations import SCHEMA_VERSION, current_version, upgrade
+from .replicas import ReadAfterWriteMiddleware
+from .routers import admin, aio, ambiances, catalog, categories, courses, levels, progress
+from .search import detect_search
 from .seeds import seed_demo_data
+from .snapshots import snapshot_publisher
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title=settings.app_name, version="1.0.0")
 
@@ -14,23 +28,127 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
 )
 
+if replica_engines:
+    app.add_middleware(ReadAfterWriteMiddleware, sticky_seconds=settings.replica_sticky_seconds)
 
-@app.on_event("startup")
-def on_startup() -> None:
-    """Initialize the database and optionally load seed data."""
+if settings.sql_instrumentation:
+    for instrumented in (engine, *replica_engines):
+        instrument_engine(instrumented)
+    for instrumented in ([async_engine] if async_engine is not None else []) + async_replica_engines:
+        instrument_engine(instrumented.sync_engine)
+    app.add_middleware(
+        SQLInstrumentationMiddleware,
+        slow_statements=settings.sql_slow_statements,
+        repeated_threshold=settings.sql_repeated_statement_threshold,
+    )
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError) -> JSONResponse:
+    """Report an exhausted connection pool as a retryable overload, not a server error."""
+
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database connection pool exhausted"},
+        headers={"Retry-After": "1"},
+    )
+
+
+class WorkerState:
+    """Readiness of this worker, reported by ``GET /ready``."""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.detail = "starting"
+        self.schema_version: Optional[int] = None
+
+
+worker_state = WorkerState()
+
+
+def prepare_database() -> None:
+    """Check the schema version and open a connection on every sync engine.
+
+    Migrations only run here with ``AUTO_MIGRATE``; otherwise the worker reads
+    one row and stays not ready if the database is behind. A ready worker has
+    published the catalog snapshot; one that cannot publish stays not ready.
+    """
 
-    init_db()
+    if settings.auto_migrate:
+        upgrade(engine)
+    with engine.connect() as connection:
+        worker_state.schema_version = current_version(connection)
+        detect_search(connection)
+    if worker_state.schema_version < SCHEMA_VERSION:
+        worker_state.detail = (
+            f"database schema version {worker_state.schema_version} is behind {SCHEMA_VERSION}; "
+            "run python -m backend.app.maintenance migrate"
+        )
+        logger.error("Not ready: %s", worker_state.detail)
+        return
+    for replica in replica_engines:
+        with replica.connect():
+            pass
     if settings.auto_seed:
         seed_demo_data()
+    # The catalog may have changed while no worker was running.
+    try:
+        snapshot_publisher.publish()
+    except Exception as error:
+        worker_state.detail = f"cannot publish the catalog snapshot: {error}"
+        logger.exception("Not ready: %s", worker_state.detail)
+        return
+    worker_state.ready = True
 
 
-app.include_router(categories.router)
-app.include_router(levels.router)
-app.include_router(ambiances.router)
-app.include_router(courses.router)
-app.include_router(progress.router)
+@app.on_event("startup")
+async def on_startup() -> None:
+    """Prepare the database connections and mark the worker ready."""
+
+    await run_in_threadpool(prepare_database)
+    if not worker_state.ready:
+        return
+    for warmed in ([async_engine] if async_engine is not None else []) + async_replica_engines:
+        async with warmed.connect():
+            pass
+    # Always running: the progress WebSocket buffers heartbeats whatever HEARTBEAT_WRITE_BEHIND says.
+    heartbeat_buffer.start()
+    snapshot_publisher.start()
+    worker_state.detail = "ready"
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    """Stop taking traffic and write buffered listening heartbeats before the worker exits."""
+
+    worker_state.ready = False
+    worker_state.detail = "shutting down"
+    heartbeat_buffer.stop()
+    snapshot_publisher.stop()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engines() -> None:
+    """Close the connections held by the asyncio engines."""
+
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+
+
+api_modules = (
+    (aio.categories, aio.levels, aio.ambiances, aio.courses, aio.progress)
+    if settings.async_database
+    else (categories, levels, ambiances, courses, progress)
+)
+for module in api_modules:
+    app.include_router(module.router)
+app.include_router(catalog.router)
+app.include_router(admin.router)
 
 
 @app.get("/health", tags=["health"])
@@ -38,3 +156,17 @@ def healthcheck() -> dict[str, str]:
     """Simple endpoint used to monitor the API."""
 
     return {"status": "ok"}
+
+
+@app.get("/ready", tags=["health"])
+def readiness() -> JSONResponse:
+    """Readiness probe: 200 once the schema is current and the connections are warm, else 503."""
+
+    content: Dict[str, object] = {
+        "status": "ready" if worker_state.ready else "not ready",
+        "detail": worker_state.detail,
+        "schema_version": worker_state.schema_version,
+        "expected_schema_version": SCHEMA_VERSION,
+    }
+    code = status.HTTP_200_OK if worker_state.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(content=content, status_code=code)
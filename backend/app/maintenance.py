@@ -0,0 +1,112 @@
+"""Maintenance commands: schema migrations and recomputing derived data.
+
+Run ``python -m backend.app.maintenance --help`` for the list of commands.
+"""
+
+import argparse
+import logging
+from typing import Optional, Sequence
+
+from .cache import invalidate_catalog
+from .crud.courses import rebuild_course_aggregates
+from .crud.rollups import rebuild_progress_rollups
+from .database import engine, session_scope
+from .explain import HOT_QUERIES, explain_hot_queries
+from .migrations import MIGRATIONS, SCHEMA_VERSION, current_version, upgrade
+from .seeds import seed_demo_data
+from .snapshots import snapshot_publisher
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_command(args: argparse.Namespace) -> None:
+    if not upgrade(engine, args.target or SCHEMA_VERSION):
+        logger.info("Database schema already up to date")
+    if args.seed:
+        seed_demo_data()
+        logger.info("Loaded the demo data")
+
+
+def schema_status_command(args: argparse.Namespace) -> None:
+    with engine.connect() as connection:
+        version = current_version(connection)
+    for migration in MIGRATIONS:
+        state = "applied" if migration.version <= version else "pending"
+        print(f"{migration.version:>4}  {state:<8} {migration.description}")
+
+
+def rebuild_course_aggregates_command(args: argparse.Namespace) -> None:
+    with session_scope() as session:
+        updated = rebuild_course_aggregates(session, args.course_id or None)
+    invalidate_catalog()
+    snapshot_publisher.publish()
+    logger.info("Rebuilt the session aggregates of %d courses", updated)
+
+
+def rebuild_progress_rollups_command(args: argparse.Namespace) -> None:
+    with session_scope() as session:
+        rebuild_progress_rollups(session, user_ids=args.user_id or None)
+    logger.info("Rebuilt the progress rollups of %s", f"users {args.user_id}" if args.user_id else "every user")
+
+
+def publish_snapshot_command(args: argparse.Namespace) -> None:
+    snapshot = snapshot_publisher.publish()
+    print(snapshot.version)
+
+
+def explain_command(args: argparse.Namespace) -> None:
+    with engine.connect() as connection:
+        plans = explain_hot_queries(connection, args.analyze, args.query)
+    for plan in plans:
+        print(f"== {plan.name}: {plan.description}")
+        print(plan.statement)
+        print("\n".join(f"  {line}" for line in plan.plan))
+        if plan.full_scans:
+            print(f"  !! full scan of {', '.join(plan.full_scans)}")
+        print()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Apply the pending schema migrations")
+    migrate.add_argument("--target", type=int, help=f"Stop at this version (default: latest, {SCHEMA_VERSION})")
+    migrate.add_argument("--seed", action="store_true", help="Load the demo data afterwards")
+    migrate.set_defaults(handler=migrate_command)
+
+    status = commands.add_parser("schema-status", help="List the migrations and whether they are applied")
+    status.set_defaults(handler=schema_status_command)
+
+    aggregates = commands.add_parser(
+        "rebuild-course-aggregates",
+        help="Recompute session_count and sessions_total_minutes of the courses from their sessions",
+    )
+    aggregates.add_argument("--course-id", type=int, action="append", help="Only these courses (repeatable)")
+    aggregates.set_defaults(handler=rebuild_course_aggregates_command)
+
+    rollups = commands.add_parser(
+        "rebuild-progress-rollups",
+        help="Recompute the per-user progress rollups behind /progress/me/summary from user_progress",
+    )
+    rollups.add_argument("--user-id", type=int, action="append", help="Only these users (repeatable)")
+    rollups.set_defaults(handler=rebuild_progress_rollups_command)
+
+    snapshot = commands.add_parser(
+        "publish-snapshot",
+        help="Render the catalog snapshot served by /catalog/snapshot (after direct SQL writes)",
+    )
+    snapshot.set_defaults(handler=publish_snapshot_command)
+
+    explain = commands.add_parser("explain", help="Print the query plans of the hot catalog and progress queries")
+    explain.add_argument("--analyze", action="store_true", help="Run the statements (EXPLAIN ANALYZE, PostgreSQL only)")
+    explain.add_argument("--query", action="append", choices=[query.name for query in HOT_QUERIES])
+    explain.set_defaults(handler=explain_command)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Versioned schema migrations.
+
+The schema version of a database is the highest ``version`` recorded in its
+``schema_version`` table. :func:`upgrade` applies the pending steps of
+:data:`MIGRATIONS` in order, each in its own transaction, and is meant to run
+once per deploy, before the new workers start::
+
+    python -m backend.app.maintenance migrate
+
+Workers only read the recorded version at startup (:func:`current_version`)
+and report themselves not ready while it is behind :data:`SCHEMA_VERSION`.
+Steps are idempotent, so they also adopt databases created by ``create_all``
+before versioning existed. New schema changes get a new step at the end of
+:data:`MIGRATIONS`; applied steps are never edited.
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session, SQLModel
+
+from .crud.courses import rebuild_course_aggregates
+from .crud.rollups import rebuild_progress_rollups
+from .models.entities import Course, ProgressRollup, UserProgress
+from .search import install_search
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _create_tables(connection: Connection) -> None:
+    SQLModel.metadata.create_all(connection)
+
+
+def _add_course_aggregates(connection: Connection) -> None:
+    existing = {column["name"] for column in inspect(connection).get_columns(Course.__tablename__)}
+    missing = [name for name in ("session_count", "sessions_total_minutes") if name not in existing]
+    for name in missing:
+        connection.exec_driver_sql(f"ALTER TABLE courses ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0")
+    if missing:
+        rebuild_course_aggregates(Session(bind=connection))
+
+
+def _populate_progress_rollups(connection: Connection) -> None:
+    has_rollups = connection.execute(select(ProgressRollup.user_id).limit(1)).first() is not None
+    has_progress = connection.execute(select(UserProgress.id).limit(1)).first() is not None
+    if has_progress and not has_rollups:
+        rebuild_progress_rollups(Session(bind=connection))
+
+
+def _create_indexes(connection: Connection) -> None:
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _install_search(connection: Connection) -> None:
+    install_search(connection)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create the tables", _create_tables),
+    Migration(2, "Add the session aggregates of courses", _add_course_aggregates),
+    Migration(3, "Populate the progress rollups", _populate_progress_rollups),
+    Migration(4, "Index the hot query shapes", _create_indexes),
+    Migration(5, "Install the course search index", _install_search),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(connection: Connection) -> int:
+    """Return the schema version of the database, 0 if it was never migrated."""
+
+    if not inspect(connection).has_table(schema_version.name):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(engine: Engine, target: int = SCHEMA_VERSION) -> List[Migration]:
+    """Apply the migrations up to ``target`` that the database lacks; return them."""
+
+    applied: List[Migration] = []
+    postgresql = engine.dialect.name == "postgresql"
+    with engine.connect() as connection:
+        with connection.begin():
+            if postgresql:
+                # Session level lock serializing deploy jobs or workers migrating the same database.
+                connection.exec_driver_sql("SELECT pg_advisory_lock(hashtext('schema_version'))")
+            schema_version.create(connection, checkfirst=True)
+            version = current_version(connection)
+        try:
+            for migration in MIGRATIONS:
+                if migration.version <= version or migration.version > target:
+                    continue
+                logger.info("Applying migration %d: %s", migration.version, migration.description)
+                with connection.begin():
+                    migration.apply(connection)
+                    connection.execute(
+                        insert(schema_version).values(
+                            version=migration.version,
+                            description=migration.description,
+                            applied_at=datetime.utcnow(),
+                        )
+                    )
+                applied.append(migration)
+        finally:
+            if postgresql:
+                connection.exec_driver_sql("SELECT pg_advisory_unlock(hashtext('schema_version'))")
+                connection.commit()
+    return applied
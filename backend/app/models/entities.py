@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import Column, String, UniqueConstraint
+from sqlalchemy import Column, Index, String, UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -67,9 +67,17 @@ class CourseBase(SQLModel):
 
 class Course(CourseBase, TimestampMixin, table=True):
     __tablename__ = "courses"
-    __table_args__ = (UniqueConstraint("title", name="uq_courses_title"),)
+    __table_args__ = (
+        UniqueConstraint("title", name="uq_courses_title"),
+        # Catalog pages filtered by a reference and walked by keyset on (title, id).
+        Index("ix_courses_category_title", "category_id", "title", "id"),
+        Index("ix_courses_level_title", "level_id", "title", "id"),
+        Index("ix_courses_ambience_title", "ambience_id", "title", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
+    session_count: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    sessions_total_minutes: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
 
     category: Optional[Category] = Relationship(back_populates="courses")
     level: Optional[Level] = Relationship(back_populates="courses")
@@ -87,6 +95,7 @@ class CourseSessionBase(SQLModel):
 
 class CourseSession(CourseSessionBase, TimestampMixin, table=True):
     __tablename__ = "course_sessions"
+    __table_args__ = (Index("ix_course_sessions_course_order", "course_id", "order", "id"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     course_id: int = Field(foreign_key="courses.id")
@@ -122,7 +131,12 @@ class UserProgressBase(SQLModel):
 
 class UserProgress(UserProgressBase, TimestampMixin, table=True):
     __tablename__ = "user_progress"
-    __table_args__ = (UniqueConstraint("user_id", "course_id", name="uq_progress_user_course"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_progress_user_course"),
+        # /progress/me lists a user's progress by most recent update.
+        Index("ix_user_progress_user_updated", "user_id", "updated_at"),
+        Index("ix_user_progress_course", "course_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
@@ -130,3 +144,23 @@ class UserProgress(UserProgressBase, TimestampMixin, table=True):
 
     user: User = Relationship(back_populates="progresses")
     course: Course = Relationship(back_populates="progresses")
+
+
+class ProgressRollup(SQLModel, table=True):
+    """Per-user progress totals, overall and by course category and level.
+
+    ``dimension`` is ``total``, ``category`` or ``level`` and ``key_id`` the
+    category or level id (0 for the overall total and for courses without
+    one). Rows are maintained incrementally by the progress writes.
+    """
+
+    __tablename__ = "progress_rollups"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    dimension: str = Field(primary_key=True, max_length=16)
+    key_id: int = Field(primary_key=True)
+    not_started: int = Field(default=0, nullable=False)
+    in_progress: int = Field(default=0, nullable=False)
+    completed: int = Field(default=0, nullable=False)
+    listened_seconds: int = Field(default=0, nullable=False)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
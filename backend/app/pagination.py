@@ -0,0 +1,32 @@
+"""Helpers for keyset (cursor based) pagination."""
+
+import base64
+import binascii
+import json
+from typing import Any, Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+
+    raw = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, arity: int) -> Tuple[Any, ...]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises a 400 error when the cursor is malformed so clients get a clear
+    message instead of an empty page.
+    """
+
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != arity:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return tuple(values)
@@ -0,0 +1,125 @@
+"""Connection pools reporting live checkout metrics.
+
+:class:`InstrumentedQueuePool` (and its asyncio counterpart) behave like the
+SQLAlchemy pools they extend, and additionally count checkouts, the callers
+blocked until a connection is returned, checkout timeouts and a histogram of
+those blocking waits. The numbers are exposed by ``GET /admin/pool``.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue, Empty, Queue
+
+from .schemas.pool import PoolStatus, WaitBucket
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+
+class _QueueMetrics:
+    """Mixin instrumenting the idle-connection queue of a pool.
+
+    Only callers finding the queue empty while the pool may not overflow
+    block in ``get``; they alone count as waiters, and only their blocking
+    wait enters the histogram (not the time to open an overflow connection).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.waiters = 0
+        self.timeouts = 0
+        self.wait_counts: List[int] = [0] * len(WAIT_BUCKETS)
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        with self._metrics_lock:
+            self.checkouts += 1
+        if not block:
+            return super().get(False)
+        try:
+            return super().get(False)
+        except Empty:
+            pass
+        started = time.perf_counter()
+        with self._metrics_lock:
+            self.waiters += 1
+        try:
+            return super().get(True, timeout)
+        except Empty:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._metrics_lock:
+                self.waiters -= 1
+                self.wait_counts[bisect.bisect_left(WAIT_BUCKETS, waited)] += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+class _InstrumentedQueue(_QueueMetrics, Queue):
+    pass
+
+
+class _InstrumentedAsyncQueue(_QueueMetrics, AsyncAdaptedQueue):
+    pass
+
+
+class InstrumentedQueuePool(QueuePool):
+    _queue_class = _InstrumentedQueue
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    _queue_class = _InstrumentedAsyncQueue
+
+
+def pool_status(name: str, engine: Engine) -> PoolStatus:
+    """Snapshot the state of ``engine``'s pool (pass ``AsyncEngine.sync_engine``)."""
+
+    pool = engine.pool
+    status = PoolStatus(name=name, url=engine.url.render_as_string(hide_password=True), pool=type(pool).__name__)
+    if isinstance(pool, QueuePool):
+        status.size = pool.size()
+        status.checked_in = pool.checkedin()
+        status.checked_out = pool.checkedout()
+        status.overflow = max(pool.overflow(), 0)
+        status.max_overflow = pool._max_overflow
+        status.timeout = pool.timeout()
+    queue = getattr(pool, "_pool", None)
+    if isinstance(queue, _QueueMetrics):
+        with queue._metrics_lock:
+            waits = sum(queue.wait_counts)
+            status.waiters = queue.waiters
+            status.timeouts = queue.timeouts
+            status.checkouts = queue.checkouts
+            status.waits = waits
+            status.wait_mean_ms = round(queue.wait_total / waits * 1000, 3) if waits else 0.0
+            status.wait_max_ms = round(queue.wait_max * 1000, 3)
+            status.wait_histogram = [
+                WaitBucket(le_ms=None if bound == float("inf") else bound * 1000, count=count)
+                for bound, count in zip(WAIT_BUCKETS, queue.wait_counts)
+            ]
+    return status
+
+
+def pool_options(
+    size: int, max_overflow: int, timeout: float, recycle: int, is_async: bool = False
+) -> Dict[str, Optional[Any]]:
+    """``create_engine`` keyword arguments selecting an instrumented pool."""
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": size,
+        "max_overflow": max_overflow,
+        "pool_timeout": timeout,
+        "pool_recycle": recycle,
+    }
@@ -0,0 +1,113 @@
+"""In-process index of the reference data (categories, levels, ambiances).
+
+These tables are small and rarely change, yet every course or progress
+response used to load them with three ``selectinload`` queries.
+:data:`reference_index` keeps an id-indexed copy of them and :meth:`attach`
+sets ``category``, ``level`` and ``ambience`` on loaded courses from it, so the
+response schemas serialize them without a query. The shared rows are detached
+instances: each session gets its own copies through ``merge(load=False)``, so
+writes cascading from a loaded course see persistent rows and never insert.
+
+The copy is checked against the tables' validators (see
+:mod:`app.conditional`) at most every ``REFERENCE_INDEX_CHECK_SECONDS``,
+immediately after a catalog write in this worker, and when a course names an
+id the copy lacks. It is reloaded only when the validators changed.
+"""
+
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Type
+
+from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, SQLModel
+
+from .cache import on_catalog_change
+from .conditional import load_validators
+from .config import settings
+from .models.entities import Ambience, Category, Course, Level
+
+REFERENCE_TABLES = (Category, Level, Ambience)
+
+
+class References(NamedTuple):
+    digest: str
+    categories: Dict[int, Category]
+    levels: Dict[int, Level]
+    ambiances: Dict[int, Ambience]
+
+
+def _load_rows(session: Session, model: Type[SQLModel]) -> Dict[int, SQLModel]:
+    # Detached instances built from Core rows: they belong to no session, stay
+    # readable from any thread and are only ever merged, never added.
+    rows = {}
+    for row in session.execute(select(model.__table__)):
+        instance = rows[row.id] = model(**row._mapping)
+        make_transient_to_detached(instance)
+    return rows
+
+
+class ReferenceIndex:
+    """Id-indexed copy of the reference tables shared by the requests of a worker."""
+
+    def __init__(self, check_interval_seconds: float) -> None:
+        self.check_interval_seconds = check_interval_seconds
+        self._references: Optional[References] = None
+        self._checked_at = float("-inf")
+
+    def invalidate(self) -> None:
+        """Check the validators on the next use."""
+
+        self._checked_at = float("-inf")
+
+    def references(self, session: Session) -> References:
+        """Return the current copy, checking or reloading it through ``session`` when due.
+
+        No lock is held: async routes run this on the event loop, and
+        concurrent refreshes at worst load the same rows twice.
+        """
+
+        references = self._references
+        if references is not None and time.monotonic() - self._checked_at < self.check_interval_seconds:
+            return references
+        digest = load_validators(session, REFERENCE_TABLES).digest
+        if references is None or references.digest != digest:
+            references = References(digest, *(_load_rows(session, model) for model in REFERENCE_TABLES))
+            self._references = references
+        self._checked_at = time.monotonic()
+        return references
+
+    def attach(self, session: Session, courses: Iterable[Course]) -> None:
+        """Set the category, level and ambience of loaded ``courses`` without querying them."""
+
+        courses = list(courses)
+        references = self.references(session)
+        if any(self._missing(references, course) for course in courses):
+            self.invalidate()
+            references = self.references(session)
+        copies: Dict[int, SQLModel] = {}
+
+        def local(instance: Optional[SQLModel]) -> Optional[SQLModel]:
+            if instance is None:
+                return None
+            copy = copies.get(id(instance))
+            if copy is None:
+                copy = copies[id(instance)] = session.merge(instance, load=False)
+            return copy
+
+        for course in courses:
+            set_committed_value(course, "category", local(references.categories.get(course.category_id)))
+            set_committed_value(course, "level", local(references.levels.get(course.level_id)))
+            set_committed_value(course, "ambience", local(references.ambiances.get(course.ambience_id)))
+
+    @staticmethod
+    def _missing(references: References, course: Course) -> bool:
+        return (
+            (course.category_id is not None and course.category_id not in references.categories)
+            or (course.level_id is not None and course.level_id not in references.levels)
+            or (course.ambience_id is not None and course.ambience_id not in references.ambiances)
+        )
+
+
+reference_index = ReferenceIndex(check_interval_seconds=settings.reference_index_check_seconds)
+on_catalog_change(reference_index.invalidate)
@@ -0,0 +1,74 @@
+"""Read-after-write consistency for replica routing.
+
+Read-only endpoints query a replica (see :func:`database.read_engine`), which
+may lag behind the primary. :class:`ReadAfterWriteMiddleware` remembers the
+users whose writes succeeded and :func:`reads_from_primary` keeps their reads
+on the primary for ``REPLICA_STICKY_SECONDS``. The marker lives in this
+worker's memory and in a cookie, so callers keeping cookies stay consistent
+whichever worker serves their next read.
+"""
+
+import time
+from http.cookies import SimpleCookie
+from typing import Any, Mapping, Optional
+
+from .cache import LRUCache, catalog_cache
+from .config import settings
+
+PRIMARY_COOKIE = "respir_primary_until"
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_recent_writers = LRUCache(
+    max_entries=settings.user_cache_max_entries,
+    ttl_seconds=settings.replica_sticky_seconds,
+)
+
+
+def remember_write(email: str) -> None:
+    """Keep the reads of ``email`` on the primary in this worker after a write."""
+
+    _recent_writers.set(email, True)
+
+
+def reads_from_primary(email: Optional[str], cookies: Mapping[str, str]) -> bool:
+    """Whether a read must see the primary because of a recent write."""
+
+    if time.monotonic() - catalog_cache.bumped_at < settings.replica_sticky_seconds:
+        return True
+    if email and _recent_writers.get(email):
+        return True
+    try:
+        return float(cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadAfterWriteMiddleware:
+    """ASGI middleware marking the authors of successful writes as sticky to the primary."""
+
+    def __init__(self, app: Any, sticky_seconds: float) -> None:
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        email = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"x-user-email"), None)
+
+        async def send_with_marker(message) -> None:
+            if message["type"] == "http.response.start" and email and message["status"] < 400:
+                remember_write(email)
+                cookie = SimpleCookie()
+                cookie[PRIMARY_COOKIE] = f"{time.time() + self.sticky_seconds:.3f}"
+                cookie[PRIMARY_COOKIE].update(
+                    {"max-age": str(int(self.sticky_seconds) + 1), "path": "/", "httponly": True, "samesite": "Lax"}
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie[PRIMARY_COOKIE].OutputString().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_marker)
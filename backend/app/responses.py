@@ -0,0 +1,25 @@
+"""Helpers producing pre-rendered JSON responses."""
+
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+
+def render_json(content: Any) -> bytes:
+    """Serialize a response body exactly as FastAPI would for ``response_model``.
+
+    Plain dicts (see :mod:`app.serializers`), lists, enums and datetimes are
+    encoded by orjson directly; pydantic models go through ``jsonable_encoder``.
+    The output matches ``JSONResponse``: compact separators, UTF-8, no ASCII
+    escaping.
+    """
+
+    return orjson.dumps(content, default=jsonable_encoder)
+
+
+def json_response(body: bytes, headers: Optional[Mapping[str, str]] = None, status_code: int = 200) -> Response:
+    """Wrap an already rendered JSON body."""
+
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
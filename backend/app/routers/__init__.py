@@ -1,9 +1,11 @@
 """Collection of API routers exposed by the backend service."""
 
-from . import ambiances, categories, courses, levels, progress
+from . import admin, ambiances, catalog, categories, courses, levels, progress
 
 __all__ = [
+    "admin",
     "ambiances",
+    "catalog",
     "categories",
     "courses",
     "levels",
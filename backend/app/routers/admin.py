@@ -0,0 +1,206 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+from ..cache import invalidate_catalog
+from ..crud import exports as crud_exports
+from ..crud import imports as crud_imports
+from ..crud.imports import ReferenceLookup
+from ..database import async_engine, async_replica_engines, engine, replica_engines, session_scope
+from ..dependencies import require_admin
+from ..explain import HOT_QUERIES, explain_hot_queries
+from ..jsonstream import JSONArrayParser, JSONStreamError, NDJSONParser
+from ..schemas.explain import QueryPlan
+from ..schemas.exports import ExportFormat
+from ..pool import pool_status
+from ..schemas.imports import CourseImportResult, CourseImportSummary, ImportStatus
+from ..schemas.pool import PoolStatus
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+def _load_reference_lookup() -> ReferenceLookup:
+    with Session(engine) as session:
+        return crud_imports.load_reference_lookup(session)
+
+
+def _import_chunk(items: List[Tuple[int, Any]], references: ReferenceLookup) -> List[CourseImportResult]:
+    try:
+        with session_scope() as session:
+            return crud_imports.import_course_chunk(session, items, references)
+    except SQLAlchemyError as exc:
+        return crud_imports.failed_chunk(items, f"Chunk rolled back: {getattr(exc, 'orig', exc)}")
+
+
+@router.post("/courses/import", response_model=CourseImportSummary)
+async def import_courses(
+    request: Request,
+    chunk_size: int = Query(500, ge=1, le=5000, description="Number of courses written per transaction"),
+):
+    """Upsert courses and their sessions from a JSON array or an NDJSON stream.
+
+    The body is parsed while it is received and written in chunked
+    transactions, so memory stays bounded by ``chunk_size``. Courses are
+    matched on their title; an updated course has its sessions replaced by the
+    imported ones. References accept either ``category_id`` or ``category``
+    (name), and likewise for ``level`` and ``ambience``.
+    """
+
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parser = NDJSONParser() if media_type in NDJSON_MEDIA_TYPES else JSONArrayParser()
+    references = await run_in_threadpool(_load_reference_lookup)
+    summary = CourseImportSummary()
+    batch: List[Tuple[int, Any]] = []
+    count = 0
+
+    async def flush() -> None:
+        results = await run_in_threadpool(_import_chunk, list(batch), references)
+        batch.clear()
+        summary.results.extend(results)
+
+    try:
+        async for chunk in request.stream():
+            for item in parser.feed(chunk):
+                batch.append((count, item))
+                count += 1
+                if len(batch) >= chunk_size:
+                    await flush()
+        for item in parser.close():
+            batch.append((count, item))
+            count += 1
+    except JSONStreamError as exc:
+        summary.error = f"{exc} (after {count} items)"
+    if batch:
+        await flush()
+
+    for result in summary.results:
+        if result.status == ImportStatus.CREATED:
+            summary.created += 1
+        elif result.status == ImportStatus.UPDATED:
+            summary.updated += 1
+        else:
+            summary.failed += 1
+    if summary.created or summary.updated:
+        invalidate_catalog()
+    if summary.error:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=jsonable_encoder(summary))
+    return summary
+
+
+@router.get("/pool", response_model=List[PoolStatus])
+def database_pools() -> List[PoolStatus]:
+    """Live connection pool usage of this worker: checkouts, overflow, waiters and wait times."""
+
+    pools = [pool_status("primary", engine)]
+    if async_engine is not None:
+        pools.append(pool_status("primary-async", async_engine.sync_engine))
+    for index, replica in enumerate(replica_engines):
+        pools.append(pool_status(f"replica-{index}", replica))
+    for index, replica in enumerate(async_replica_engines):
+        pools.append(pool_status(f"replica-{index}-async", replica.sync_engine))
+    return pools
+
+
+@router.get("/explain", response_model=List[QueryPlan])
+def explain_queries(
+    analyze: bool = Query(False, description="Run the statements (EXPLAIN ANALYZE, PostgreSQL only)"),
+    query: Optional[List[str]] = Query(None, description=f"Only these queries: {', '.join(q.name for q in HOT_QUERIES)}"),
+) -> List[QueryPlan]:
+    """Plans of the statements behind the hot endpoints, with the tables they read by full scan."""
+
+    with engine.connect() as connection:
+        return explain_hot_queries(connection, analyze, query)
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _ndjson_line(row: dict) -> str:
+    return json.dumps(row, default=_export_value, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _csv_row(row: dict) -> List[Any]:
+    return [
+        json.dumps(value, default=_export_value, ensure_ascii=False) if isinstance(value, list) else _export_value(value)
+        for value in row.values()
+    ]
+
+
+def _render_export(
+    rows: Callable[..., Iterator[dict]], columns: Tuple[str, ...], export_format: ExportFormat, since: Optional[datetime]
+) -> Iterator[bytes]:
+    """Yield the export in blocks of ``YIELD_PER`` rows.
+
+    The connection is opened here, when the response starts streaming, and
+    closed as soon as the generator finishes or the client disconnects.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == ExportFormat.CSV:
+        writer.writerow(columns)
+    with engine.connect() as connection:
+        for count, row in enumerate(rows(connection, since), start=1):
+            if export_format == ExportFormat.CSV:
+                writer.writerow(_csv_row(row))
+            else:
+                buffer.write(_ndjson_line(row))
+            if count % crud_exports.YIELD_PER == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _export_response(
+    name: str, rows: Callable[..., Iterator[dict]], columns: Tuple[str, ...], export_format: ExportFormat, since: Optional[datetime]
+) -> StreamingResponse:
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _render_export(rows, columns, export_format, since),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'},
+    )
+
+
+EXPORT_FORMAT = Query(ExportFormat.NDJSON, alias="format", description="ndjson (default) or csv")
+EXPORT_SINCE = Query(None, description="Only export rows updated at or after this timestamp")
+
+
+@router.get("/exports/courses", response_class=StreamingResponse)
+def export_courses(export_format: ExportFormat = EXPORT_FORMAT, since: Optional[datetime] = EXPORT_SINCE):
+    """Stream every course with its sessions; in CSV the sessions are a JSON column."""
+
+    columns = crud_exports.COURSE_COLUMNS + ("sessions",)
+    return _export_response("courses", crud_exports.iter_courses, columns, export_format, since)
+
+
+@router.get("/exports/users", response_class=StreamingResponse)
+def export_users(export_format: ExportFormat = EXPORT_FORMAT, since: Optional[datetime] = EXPORT_SINCE):
+    """Stream every user."""
+
+    return _export_response("users", crud_exports.iter_users, crud_exports.USER_COLUMNS, export_format, since)
+
+
+@router.get("/exports/progress", response_class=StreamingResponse)
+def export_progress(export_format: ExportFormat = EXPORT_FORMAT, since: Optional[datetime] = EXPORT_SINCE):
+    """Stream every ``user_progress`` row."""
+
+    return _export_response("progress", crud_exports.iter_progress, crud_exports.PROGRESS_COLUMNS, export_format, since)
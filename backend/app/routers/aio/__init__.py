@@ -0,0 +1,15 @@
+"""Async variants of the routers, served when ``ASYNC_DATABASE`` is enabled.
+
+They expose the same paths and payloads as their sync counterparts and reuse
+the data access helpers from :mod:`app.crud` through ``AsyncSession.run_sync``.
+"""
+
+from . import ambiances, categories, courses, levels, progress
+
+__all__ = [
+    "ambiances",
+    "categories",
+    "courses",
+    "levels",
+    "progress",
+]
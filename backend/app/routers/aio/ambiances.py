@@ -0,0 +1,67 @@
+from typing import List, Union
+
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...cache import invalidate_catalog
+from ...conditional import NOT_MODIFIED_RESPONSES, revalidate_async
+from ...crud import reference as crud
+from ...database import get_async_session
+from ...dependencies import get_async_read_session, require_admin
+from ...models.entities import Ambience
+from ...schemas.ambience import AmbienceCreate, AmbienceRead, AmbienceUpdate
+
+router = APIRouter(prefix="/ambiances", tags=["ambiances"])
+
+TABLES = (Ambience,)
+
+
+@router.get("/", response_model=List[AmbienceRead], responses=NOT_MODIFIED_RESPONSES)
+async def list_ambiances(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_read_session),
+) -> Union[List[Ambience], Response]:
+    revalidated = await revalidate_async(request, session, TABLES)
+    if isinstance(revalidated, Response):
+        return revalidated
+    response.headers.update(revalidated)
+    return await session.run_sync(crud.list_rows, Ambience, Ambience.name)
+
+
+@router.get("/{ambience_id}", response_model=AmbienceRead)
+async def get_ambience(ambience_id: int, session: AsyncSession = Depends(get_async_read_session)) -> Ambience:
+    return await session.run_sync(crud.get_row, Ambience, ambience_id, "Ambience")
+
+
+@router.post("/", response_model=AmbienceRead, status_code=status.HTTP_201_CREATED)
+async def create_ambience(
+    payload: AmbienceCreate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> Ambience:
+    ambience = await session.run_sync(crud.create_row, Ambience, payload)
+    invalidate_catalog()
+    return ambience
+
+
+@router.put("/{ambience_id}", response_model=AmbienceRead)
+async def update_ambience(
+    ambience_id: int,
+    payload: AmbienceUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> Ambience:
+    ambience = await session.run_sync(crud.update_row, Ambience, ambience_id, payload, "Ambience")
+    invalidate_catalog()
+    return ambience
+
+
+@router.delete("/{ambience_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_ambience(
+    ambience_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> None:
+    await session.run_sync(crud.delete_row, Ambience, ambience_id, "Ambience")
+    invalidate_catalog()
@@ -0,0 +1,67 @@
+from typing import List, Union
+
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...cache import invalidate_catalog
+from ...conditional import NOT_MODIFIED_RESPONSES, revalidate_async
+from ...crud import reference as crud
+from ...database import get_async_session
+from ...dependencies import get_async_read_session, require_admin
+from ...models.entities import Category
+from ...schemas.category import CategoryCreate, CategoryRead, CategoryUpdate
+
+router = APIRouter(prefix="/categories", tags=["categories"])
+
+TABLES = (Category,)
+
+
+@router.get("/", response_model=List[CategoryRead], responses=NOT_MODIFIED_RESPONSES)
+async def list_categories(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_read_session),
+) -> Union[List[Category], Response]:
+    revalidated = await revalidate_async(request, session, TABLES)
+    if isinstance(revalidated, Response):
+        return revalidated
+    response.headers.update(revalidated)
+    return await session.run_sync(crud.list_rows, Category, Category.name)
+
+
+@router.get("/{category_id}", response_model=CategoryRead)
+async def get_category(category_id: int, session: AsyncSession = Depends(get_async_read_session)) -> Category:
+    return await session.run_sync(crud.get_row, Category, category_id, "Category")
+
+
+@router.post("/", response_model=CategoryRead, status_code=status.HTTP_201_CREATED)
+async def create_category(
+    payload: CategoryCreate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> Category:
+    category = await session.run_sync(crud.create_row, Category, payload)
+    invalidate_catalog()
+    return category
+
+
+@router.put("/{category_id}", response_model=CategoryRead)
+async def update_category(
+    category_id: int,
+    payload: CategoryUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> Category:
+    category = await session.run_sync(crud.update_row, Category, category_id, payload, "Category")
+    invalidate_catalog()
+    return category
+
+
+@router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_category(
+    category_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> None:
+    await session.run_sync(crud.delete_row, Category, category_id, "Category")
+    invalidate_catalog()
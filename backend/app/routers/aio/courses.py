@@ -0,0 +1,145 @@
+from typing import List, Union
+
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...cache import catalog_cache, invalidate_catalog
+from ...conditional import CATALOG_TABLES, NOT_MODIFIED_RESPONSES, revalidate_async
+from ...crud import courses as crud
+from ...crud.courses import CourseFilters
+from ...database import get_async_session
+from ...dependencies import get_async_read_session, require_admin
+from ...responses import json_response, render_json
+from ...schemas.course import CourseCreate, CourseRead, CourseSummary, CourseUpdate
+from ...schemas.session import CourseSessionCreate, CourseSessionRead, CourseSessionUpdate
+from ..courses import SearchParams, course_filters, render_course_page, search_params
+
+router = APIRouter(prefix="/courses", tags=["courses"])
+
+
+@router.get(
+    "/",
+    response_model=Union[List[CourseRead], List[CourseSummary]],
+    responses=NOT_MODIFIED_RESPONSES,
+)
+async def list_courses(
+    request: Request,
+    filters: CourseFilters = Depends(course_filters),
+    session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+    """Return one page of the catalog ordered by ``(title, id)``.
+
+    The cursor of the next page is returned in ``X-Next-Cursor``. With
+    ``view=summary`` courses are returned without their sessions.
+    """
+
+    revalidated = await revalidate_async(request, session, CATALOG_TABLES, filters)
+    if isinstance(revalidated, Response):
+        return revalidated
+    cache_key = ("list", filters)
+    cached = catalog_cache.get(cache_key)
+    if cached is None:
+        version = catalog_cache.version
+        cached = render_course_page(*await session.run_sync(crud.list_course_page, filters))
+        catalog_cache.set(cache_key, cached, version)
+    body, page_headers = cached
+    return json_response(body, {**page_headers, **revalidated})
+
+
+@router.get("/search", response_model=List[CourseRead])
+async def search_courses(
+    params: SearchParams = Depends(search_params),
+    session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+    """Full-text search over course and session titles and descriptions, best match first.
+
+    Matching ignores accents and case and, on PostgreSQL, uses French stemming.
+    """
+
+    cache_key = ("search", params)
+    cached = catalog_cache.get(cache_key)
+    if cached is None:
+        version = catalog_cache.version
+        cached = (render_json(await session.run_sync(crud.search_courses, *params)), {})
+        catalog_cache.set(cache_key, cached, version)
+    return json_response(*cached)
+
+
+@router.get("/{course_id}", response_model=CourseRead)
+async def get_course(course_id: int, session: AsyncSession = Depends(get_async_read_session)) -> Response:
+    cache_key = ("course", course_id)
+    cached = catalog_cache.get(cache_key)
+    if cached is None:
+        version = catalog_cache.version
+        cached = (render_json(await session.run_sync(crud.read_course, course_id)), {})
+        catalog_cache.set(cache_key, cached, version)
+    return json_response(*cached)
+
+
+@router.post("/", response_model=CourseRead, status_code=status.HTTP_201_CREATED)
+async def create_course(
+    payload: CourseCreate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> CourseRead:
+    course = await session.run_sync(crud.create_course, payload)
+    invalidate_catalog()
+    return course
+
+
+@router.put("/{course_id}", response_model=CourseRead)
+async def update_course(
+    course_id: int,
+    payload: CourseUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> CourseRead:
+    course = await session.run_sync(crud.update_course, course_id, payload)
+    invalidate_catalog()
+    return course
+
+
+@router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_course(
+    course_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> None:
+    await session.run_sync(crud.delete_course, course_id)
+    invalidate_catalog()
+
+
+@router.post("/{course_id}/sessions", response_model=CourseSessionRead, status_code=status.HTTP_201_CREATED)
+async def add_course_session(
+    course_id: int,
+    payload: CourseSessionCreate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> CourseSessionRead:
+    course_session = await session.run_sync(crud.add_course_session, course_id, payload)
+    invalidate_catalog()
+    return course_session
+
+
+@router.patch("/{course_id}/sessions/{session_id}", response_model=CourseSessionRead)
+async def update_course_session(
+    course_id: int,
+    session_id: int,
+    payload: CourseSessionUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> CourseSessionRead:
+    course_session = await session.run_sync(crud.update_course_session, course_id, session_id, payload)
+    invalidate_catalog()
+    return course_session
+
+
+@router.delete("/{course_id}/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_course_session(
+    course_id: int,
+    session_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> None:
+    await session.run_sync(crud.delete_course_session, course_id, session_id)
+    invalidate_catalog()
@@ -0,0 +1,67 @@
+from typing import List, Union
+
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...cache import invalidate_catalog
+from ...conditional import NOT_MODIFIED_RESPONSES, revalidate_async
+from ...crud import reference as crud
+from ...database import get_async_session
+from ...dependencies import get_async_read_session, require_admin
+from ...models.entities import Level
+from ...schemas.level import LevelCreate, LevelRead, LevelUpdate
+
+router = APIRouter(prefix="/levels", tags=["levels"])
+
+TABLES = (Level,)
+
+
+@router.get("/", response_model=List[LevelRead], responses=NOT_MODIFIED_RESPONSES)
+async def list_levels(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_read_session),
+) -> Union[List[Level], Response]:
+    revalidated = await revalidate_async(request, session, TABLES)
+    if isinstance(revalidated, Response):
+        return revalidated
+    response.headers.update(revalidated)
+    return await session.run_sync(crud.list_rows, Level, Level.order, Level.name)
+
+
+@router.get("/{level_id}", response_model=LevelRead)
+async def get_level(level_id: int, session: AsyncSession = Depends(get_async_read_session)) -> Level:
+    return await session.run_sync(crud.get_row, Level, level_id, "Level")
+
+
+@router.post("/", response_model=LevelRead, status_code=status.HTTP_201_CREATED)
+async def create_level(
+    payload: LevelCreate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> Level:
+    level = await session.run_sync(crud.create_row, Level, payload)
+    invalidate_catalog()
+    return level
+
+
+@router.put("/{level_id}", response_model=LevelRead)
+async def update_level(
+    level_id: int,
+    payload: LevelUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> Level:
+    level = await session.run_sync(crud.update_row, Level, level_id, payload, "Level")
+    invalidate_catalog()
+    return level
+
+
+@router.delete("/{level_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_level(
+    level_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(require_admin),
+) -> None:
+    await session.run_sync(crud.delete_row, Level, level_id, "Level")
+    invalidate_catalog()
@@ -0,0 +1,119 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...config import settings
+from ...crud import progress as crud
+from ...crud import rollups as crud_rollups
+from ...database import get_async_session
+from ...dependencies import get_async_read_session, get_current_user_async
+from ...models.entities import User
+from ...responses import json_response, render_json
+from ...schemas.progress import (
+    ProgressBatch,
+    ProgressComplete,
+    ProgressEventResult,
+    ProgressLog,
+    ProgressRead,
+    ProgressStart,
+    ProgressSummary,
+    ProgressView,
+)
+from ..progress import (
+    LOG_RESPONSES,
+    WRITE_RESPONSES,
+    progress_response,
+    progress_socket,
+    progress_view,
+)
+
+router = APIRouter(prefix="/progress", tags=["progress"])
+router.add_api_websocket_route("/ws", progress_socket)
+
+
+@router.get("/me", response_model=List[ProgressRead])
+async def list_my_progress(
+    session: AsyncSession = Depends(get_async_read_session),
+    user: User = Depends(get_current_user_async),
+) -> Response:
+    return json_response(render_json(await session.run_sync(crud.list_user_progress, user.id)))
+
+
+@router.get("/me/summary", response_model=ProgressSummary)
+async def my_progress_summary(
+    session: AsyncSession = Depends(get_async_read_session),
+    user: User = Depends(get_current_user_async),
+) -> ProgressSummary:
+    """Counts by status and listened seconds, overall and per category and level.
+
+    Read from the user's rollup rows, so the cost does not grow with their history.
+    """
+
+    return await session.run_sync(crud_rollups.read_progress_summary, user.id)
+
+
+@router.get("/{progress_id}", response_model=ProgressRead)
+async def get_progress(
+    progress_id: int,
+    session: AsyncSession = Depends(get_async_read_session),
+    user: User = Depends(get_current_user_async),
+) -> Response:
+    return json_response(render_json(await session.run_sync(crud.read_progress, progress_id, user.id)))
+
+
+@router.post(
+    "/start",
+    response_model=ProgressRead,
+    status_code=status.HTTP_201_CREATED,
+    responses=WRITE_RESPONSES,
+)
+async def start_course(
+    payload: ProgressStart,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_user_async),
+    view: ProgressView = Depends(progress_view),
+):
+    result = await session.run_sync(crud.start_course, user.id, payload.course_id, view)
+    return progress_response(result, status.HTTP_201_CREATED)
+
+
+@router.post("/batch", response_model=List[ProgressEventResult])
+async def sync_progress_batch(
+    payload: ProgressBatch,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_user_async),
+) -> Response:
+    """Replay start/log/complete events recorded offline, in order, in one transaction.
+
+    Returns one result per event, with the compact progress right after it.
+    """
+
+    return json_response(render_json(await session.run_sync(crud.apply_progress_batch, user.id, payload.events)))
+
+
+@router.post("/{progress_id}/log", response_model=ProgressRead, responses=LOG_RESPONSES)
+async def log_listening(
+    progress_id: int,
+    payload: ProgressLog,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_user_async),
+    view: ProgressView = Depends(progress_view),
+):
+    if settings.heartbeat_write_behind:
+        await session.run_sync(crud.buffer_listening, progress_id, user.id, payload.listened_seconds)
+        return Response(status_code=status.HTTP_202_ACCEPTED)
+    result = await session.run_sync(crud.log_listening, progress_id, user.id, payload.listened_seconds, view)
+    return progress_response(result)
+
+
+@router.post("/{progress_id}/complete", response_model=ProgressRead, responses=WRITE_RESPONSES)
+async def complete_course(
+    progress_id: int,
+    payload: ProgressComplete,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_user_async),
+    view: ProgressView = Depends(progress_view),
+):
+    result = await session.run_sync(crud.complete_course, progress_id, user.id, payload.listened_seconds, view)
+    return progress_response(result)
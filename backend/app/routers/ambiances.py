@@ -1,29 +1,37 @@
-from datetime import datetime
-from typing import List
+from typing import List, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlmodel import Session
 
+from ..cache import invalidate_catalog
+from ..conditional import NOT_MODIFIED_RESPONSES, revalidate
+from ..crud import reference as crud
 from ..database import get_session
-from ..dependencies import require_admin
+from ..dependencies import get_read_session, require_admin
 from ..models.entities import Ambience
 from ..schemas.ambience import AmbienceCreate, AmbienceRead, AmbienceUpdate
 
 router = APIRouter(prefix="/ambiances", tags=["ambiances"])
 
+TABLES = (Ambience,)
 
-@router.get("/", response_model=List[AmbienceRead])
-def list_ambiances(session: Session = Depends(get_session)) -> List[Ambience]:
-    statement = select(Ambience).order_by(Ambience.name)
-    return session.exec(statement).all()
+
+@router.get("/", response_model=List[AmbienceRead], responses=NOT_MODIFIED_RESPONSES)
+def list_ambiances(
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_read_session),
+) -> Union[List[Ambience], Response]:
+    revalidated = revalidate(request, session, TABLES)
+    if isinstance(revalidated, Response):
+        return revalidated
+    response.headers.update(revalidated)
+    return crud.list_rows(session, Ambience, Ambience.name)
 
 
 @router.get("/{ambience_id}", response_model=AmbienceRead)
-def get_ambience(ambience_id: int, session: Session = Depends(get_session)) -> Ambience:
-    ambience = session.get(Ambience, ambience_id)
-    if not ambience:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ambience not found")
-    return ambience
+def get_ambience(ambience_id: int, session: Session = Depends(get_read_session)) -> Ambience:
+    return crud.get_row(session, Ambience, ambience_id, "Ambience")
 
 
 @router.post("/", response_model=AmbienceRead, status_code=status.HTTP_201_CREATED)
@@ -32,10 +40,8 @@ def create_ambience(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> Ambience:
-    ambience = Ambience(**payload.dict())
-    session.add(ambience)
-    session.commit()
-    session.refresh(ambience)
+    ambience = crud.create_row(session, Ambience, payload)
+    invalidate_catalog()
     return ambience
 
 
@@ -46,16 +52,8 @@ def update_ambience(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> Ambience:
-    ambience = session.get(Ambience, ambience_id)
-    if not ambience:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ambience not found")
-    update_data = payload.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(ambience, key, value)
-    ambience.updated_at = datetime.utcnow()
-    session.add(ambience)
-    session.commit()
-    session.refresh(ambience)
+    ambience = crud.update_row(session, Ambience, ambience_id, payload, "Ambience")
+    invalidate_catalog()
     return ambience
 
 
@@ -65,8 +63,5 @@ def delete_ambience(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> None:
-    ambience = session.get(Ambience, ambience_id)
-    if not ambience:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ambience not found")
-    session.delete(ambience)
-    session.commit()
+    crud.delete_row(session, Ambience, ambience_id, "Ambience")
+    invalidate_catalog()
@@ -0,0 +1,70 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Request, Response, status
+from fastapi.responses import FileResponse, JSONResponse
+
+from ..conditional import NOT_MODIFIED_RESPONSES, not_modified
+from ..schemas.course import CourseRead
+from ..snapshots import ENCODINGS, snapshot_publisher
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the preferred precompressed variant allowed by ``Accept-Encoding``; ``None`` for identity."""
+
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, parameters = part.partition(";")
+        weight = 1.0
+        parameter = parameters.strip().replace(" ", "")
+        if parameter.startswith("q="):
+            try:
+                weight = float(parameter[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    for encoding in ENCODINGS:
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+@router.get(
+    "/snapshot",
+    response_model=List[CourseRead],
+    responses={
+        **NOT_MODIFIED_RESPONSES,
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "No snapshot was published yet"},
+    },
+)
+async def catalog_snapshot(request: Request) -> Response:
+    """Return the full catalog from the published snapshot files, without database access.
+
+    The body is the one of ``GET /courses/`` over the whole catalog. Brotli or
+    gzip variants are chosen from ``Accept-Encoding``; ``X-Catalog-Version``
+    identifies the snapshot.
+    """
+
+    snapshot = snapshot_publisher.current()
+    if snapshot is None:
+        return JSONResponse(
+            {"detail": "The catalog snapshot is not published yet"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "1"},
+        )
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    headers = {
+        "ETag": f'"{snapshot.version}-{encoding}"' if encoding else f'"{snapshot.version}"',
+        "X-Catalog-Version": snapshot.version,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    unchanged = not_modified(request, headers)
+    if unchanged is not None:
+        return unchanged
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(snapshot.variant(encoding), media_type="application/json", headers=headers)
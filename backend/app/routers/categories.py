@@ -1,29 +1,37 @@
-from datetime import datetime
-from typing import List
+from typing import List, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlmodel import Session
 
+from ..cache import invalidate_catalog
+from ..conditional import NOT_MODIFIED_RESPONSES, revalidate
+from ..crud import reference as crud
 from ..database import get_session
-from ..dependencies import require_admin
+from ..dependencies import get_read_session, require_admin
 from ..models.entities import Category
 from ..schemas.category import CategoryCreate, CategoryRead, CategoryUpdate
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
+TABLES = (Category,)
 
-@router.get("/", response_model=List[CategoryRead])
-def list_categories(session: Session = Depends(get_session)) -> List[Category]:
-    statement = select(Category).order_by(Category.name)
-    return session.exec(statement).all()
+
+@router.get("/", response_model=List[CategoryRead], responses=NOT_MODIFIED_RESPONSES)
+def list_categories(
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_read_session),
+) -> Union[List[Category], Response]:
+    revalidated = revalidate(request, session, TABLES)
+    if isinstance(revalidated, Response):
+        return revalidated
+    response.headers.update(revalidated)
+    return crud.list_rows(session, Category, Category.name)
 
 
 @router.get("/{category_id}", response_model=CategoryRead)
-def get_category(category_id: int, session: Session = Depends(get_session)) -> Category:
-    category = session.get(Category, category_id)
-    if not category:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    return category
+def get_category(category_id: int, session: Session = Depends(get_read_session)) -> Category:
+    return crud.get_row(session, Category, category_id, "Category")
 
 
 @router.post("/", response_model=CategoryRead, status_code=status.HTTP_201_CREATED)
@@ -32,10 +40,8 @@ def create_category(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> Category:
-    category = Category(**payload.dict())
-    session.add(category)
-    session.commit()
-    session.refresh(category)
+    category = crud.create_row(session, Category, payload)
+    invalidate_catalog()
     return category
 
 
@@ -46,16 +52,8 @@ def update_category(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> Category:
-    category = session.get(Category, category_id)
-    if not category:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    update_data = payload.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(category, key, value)
-    category.updated_at = datetime.utcnow()
-    session.add(category)
-    session.commit()
-    session.refresh(category)
+    category = crud.update_row(session, Category, category_id, payload, "Category")
+    invalidate_catalog()
     return category
 
 
@@ -65,8 +63,5 @@ def delete_category(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> None:
-    category = session.get(Category, category_id)
-    if not category:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    session.delete(category)
-    session.commit()
+    crud.delete_row(session, Category, category_id, "Category")
+    invalidate_catalog()
@@ -1,50 +1,122 @@
-from datetime import datetime
-from typing import List
+from typing import List, NamedTuple, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import selectinload
-from sqlalchemy.sql import Select
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlmodel import Session
 
+from ..cache import catalog_cache, invalidate_catalog
+from ..conditional import CATALOG_TABLES, NOT_MODIFIED_RESPONSES, revalidate
+from ..crud import courses as crud
+from ..crud.courses import CourseFilters
 from ..database import get_session
-from ..dependencies import require_admin
-from ..models.entities import Course, CourseSession
-from ..schemas.course import CourseCreate, CourseRead, CourseUpdate
+from ..dependencies import get_read_session, require_admin
+from ..responses import json_response, render_json
+from ..schemas.course import CourseCreate, CourseRead, CourseSummary, CourseUpdate, CourseView
 from ..schemas.session import CourseSessionCreate, CourseSessionRead, CourseSessionUpdate
+from ..serializers import Row
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
-
-def _course_select() -> Select:
-    return (
-        select(Course)
-        .options(
-            selectinload(Course.category),
-            selectinload(Course.level),
-            selectinload(Course.ambience),
-            selectinload(Course.sessions),
-        )
-        .order_by(Course.title)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_SEARCH_SIZE = 20
+MAX_SEARCH_SIZE = 100
+
+
+class SearchParams(NamedTuple):
+    q: str
+    limit: int
+    offset: int
+
+
+def search_params(
+    q: str = Query(..., min_length=1, max_length=200, description="Words searched in titles and descriptions"),
+    limit: int = Query(DEFAULT_SEARCH_SIZE, ge=1, le=MAX_SEARCH_SIZE),
+    offset: int = Query(0, ge=0, le=1000),
+) -> SearchParams:
+    return SearchParams(" ".join(q.split()).lower(), limit, offset)
+
+
+def course_filters(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned in the X-Next-Cursor header"),
+    category_id: Optional[int] = None,
+    level_id: Optional[int] = None,
+    ambience_id: Optional[int] = None,
+    min_duration: Optional[int] = Query(None, ge=0, description="Minimum duration in minutes"),
+    max_duration: Optional[int] = Query(None, ge=0, description="Maximum duration in minutes"),
+    view: CourseView = Query(CourseView.FULL, description="summary omits the sessions of each course"),
+) -> CourseFilters:
+    return CourseFilters(
+        limit=limit,
+        cursor=cursor,
+        category_id=category_id,
+        level_id=level_id,
+        ambience_id=ambience_id,
+        min_duration=min_duration,
+        max_duration=max_duration,
+        view=view,
     )
 
 
-def _load_course(session: Session, course_id: int) -> Course:
-    statement = _course_select().where(Course.id == course_id)
-    course = session.exec(statement).unique().one_or_none()
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    return course
-
-
-@router.get("/", response_model=List[CourseRead])
-def list_courses(session: Session = Depends(get_session)) -> List[Course]:
-    courses = session.exec(_course_select()).unique().all()
-    return courses
+def render_course_page(page: List[Row], next_cursor: Optional[str]) -> tuple:
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return render_json(page), headers
+
+
+@router.get(
+    "/",
+    response_model=Union[List[CourseRead], List[CourseSummary]],
+    responses=NOT_MODIFIED_RESPONSES,
+)
+def list_courses(
+    request: Request,
+    filters: CourseFilters = Depends(course_filters),
+    session: Session = Depends(get_read_session),
+) -> Response:
+    """Return one page of the catalog ordered by ``(title, id)``.
+
+    The cursor of the next page is returned in ``X-Next-Cursor``. With
+    ``view=summary`` courses are returned without their sessions.
+    """
+
+    revalidated = revalidate(request, session, CATALOG_TABLES, filters)
+    if isinstance(revalidated, Response):
+        return revalidated
+    cache_key = ("list", filters)
+    cached = catalog_cache.get(cache_key)
+    if cached is None:
+        version = catalog_cache.version
+        cached = render_course_page(*crud.list_course_page(session, filters))
+        catalog_cache.set(cache_key, cached, version)
+    body, page_headers = cached
+    return json_response(body, {**page_headers, **revalidated})
+
+
+@router.get("/search", response_model=List[CourseRead])
+def search_courses(params: SearchParams = Depends(search_params), session: Session = Depends(get_read_session)) -> Response:
+    """Full-text search over course and session titles and descriptions, best match first.
+
+    Matching ignores accents and case and, on PostgreSQL, uses French stemming.
+    """
+
+    cache_key = ("search", params)
+    cached = catalog_cache.get(cache_key)
+    if cached is None:
+        version = catalog_cache.version
+        cached = (render_json(crud.search_courses(session, *params)), {})
+        catalog_cache.set(cache_key, cached, version)
+    return json_response(*cached)
 
 
 @router.get("/{course_id}", response_model=CourseRead)
-def get_course(course_id: int, session: Session = Depends(get_session)) -> Course:
-    return _load_course(session, course_id)
+def get_course(course_id: int, session: Session = Depends(get_read_session)) -> Response:
+    cache_key = ("course", course_id)
+    cached = catalog_cache.get(cache_key)
+    if cached is None:
+        version = catalog_cache.version
+        cached = (render_json(crud.read_course(session, course_id)), {})
+        catalog_cache.set(cache_key, cached, version)
+    return json_response(*cached)
 
 
 @router.post("/", response_model=CourseRead, status_code=status.HTTP_201_CREATED)
@@ -52,11 +124,10 @@ def create_course(
     payload: CourseCreate,
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
-) -> Course:
-    course = Course(**payload.dict())
-    session.add(course)
-    session.commit()
-    return _load_course(session, course.id)
+) -> CourseRead:
+    course = crud.create_course(session, payload)
+    invalidate_catalog()
+    return course
 
 
 @router.put("/{course_id}", response_model=CourseRead)
@@ -65,17 +136,10 @@ def update_course(
     payload: CourseUpdate,
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
-) -> Course:
-    course = session.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    update_data = payload.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(course, key, value)
-    course.updated_at = datetime.utcnow()
-    session.add(course)
-    session.commit()
-    return _load_course(session, course.id)
+) -> CourseRead:
+    course = crud.update_course(session, course_id, payload)
+    invalidate_catalog()
+    return course
 
 
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -84,11 +148,8 @@ def delete_course(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> None:
-    course = session.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    session.delete(course)
-    session.commit()
+    crud.delete_course(session, course_id)
+    invalidate_catalog()
 
 
 @router.post("/{course_id}/sessions", response_model=CourseSessionRead, status_code=status.HTTP_201_CREATED)
@@ -97,20 +158,9 @@ def add_course_session(
     payload: CourseSessionCreate,
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
-) -> CourseSession:
-    course = session.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if payload.course_id and payload.course_id != course_id:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Mismatching course identifiers")
-    session_data = payload.dict(exclude_unset=True)
-    session_data["course_id"] = course_id
-    course_session = CourseSession(**session_data)
-    session.add(course_session)
-    course.updated_at = datetime.utcnow()
-    session.add(course)
-    session.commit()
-    session.refresh(course_session)
+) -> CourseSessionRead:
+    course_session = crud.add_course_session(session, course_id, payload)
+    invalidate_catalog()
     return course_session
 
 
@@ -121,21 +171,9 @@ def update_course_session(
     payload: CourseSessionUpdate,
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
-) -> CourseSession:
-    course_session = session.get(CourseSession, session_id)
-    if not course_session or course_session.course_id != course_id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    update_data = payload.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(course_session, key, value)
-    course_session.updated_at = datetime.utcnow()
-    session.add(course_session)
-    course = session.get(Course, course_id)
-    if course:
-        course.updated_at = datetime.utcnow()
-        session.add(course)
-    session.commit()
-    session.refresh(course_session)
+) -> CourseSessionRead:
+    course_session = crud.update_course_session(session, course_id, session_id, payload)
+    invalidate_catalog()
     return course_session
 
 
@@ -146,12 +184,5 @@ def delete_course_session(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> None:
-    course_session = session.get(CourseSession, session_id)
-    if not course_session or course_session.course_id != course_id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    course = session.get(Course, course_id)
-    if course:
-        course.updated_at = datetime.utcnow()
-        session.add(course)
-    session.delete(course_session)
-    session.commit()
+    crud.delete_course_session(session, course_id, session_id)
+    invalidate_catalog()
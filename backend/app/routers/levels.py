@@ -1,29 +1,37 @@
-from datetime import datetime
-from typing import List
+from typing import List, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlmodel import Session
 
+from ..cache import invalidate_catalog
+from ..conditional import NOT_MODIFIED_RESPONSES, revalidate
+from ..crud import reference as crud
 from ..database import get_session
-from ..dependencies import require_admin
+from ..dependencies import get_read_session, require_admin
 from ..models.entities import Level
 from ..schemas.level import LevelCreate, LevelRead, LevelUpdate
 
 router = APIRouter(prefix="/levels", tags=["levels"])
 
+TABLES = (Level,)
 
-@router.get("/", response_model=List[LevelRead])
-def list_levels(session: Session = Depends(get_session)) -> List[Level]:
-    statement = select(Level).order_by(Level.order, Level.name)
-    return session.exec(statement).all()
+
+@router.get("/", response_model=List[LevelRead], responses=NOT_MODIFIED_RESPONSES)
+def list_levels(
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_read_session),
+) -> Union[List[Level], Response]:
+    revalidated = revalidate(request, session, TABLES)
+    if isinstance(revalidated, Response):
+        return revalidated
+    response.headers.update(revalidated)
+    return crud.list_rows(session, Level, Level.order, Level.name)
 
 
 @router.get("/{level_id}", response_model=LevelRead)
-def get_level(level_id: int, session: Session = Depends(get_session)) -> Level:
-    level = session.get(Level, level_id)
-    if not level:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Level not found")
-    return level
+def get_level(level_id: int, session: Session = Depends(get_read_session)) -> Level:
+    return crud.get_row(session, Level, level_id, "Level")
 
 
 @router.post("/", response_model=LevelRead, status_code=status.HTTP_201_CREATED)
@@ -32,10 +40,8 @@ def create_level(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> Level:
-    level = Level(**payload.dict())
-    session.add(level)
-    session.commit()
-    session.refresh(level)
+    level = crud.create_row(session, Level, payload)
+    invalidate_catalog()
     return level
 
 
@@ -46,16 +52,8 @@ def update_level(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> Level:
-    level = session.get(Level, level_id)
-    if not level:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Level not found")
-    update_data = payload.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(level, key, value)
-    level.updated_at = datetime.utcnow()
-    session.add(level)
-    session.commit()
-    session.refresh(level)
+    level = crud.update_row(session, Level, level_id, payload, "Level")
+    invalidate_catalog()
     return level
 
 
@@ -65,8 +63,5 @@ def delete_level(
     session: Session = Depends(get_session),
     _: None = Depends(require_admin),
 ) -> None:
-    level = session.get(Level, level_id)
-    if not level:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Level not found")
-    session.delete(level)
-    session.commit()
+    crud.delete_row(session, Level, level_id, "Level")
+    invalidate_catalog()
@@ -1,135 +1,233 @@
-from datetime import datetime
-from typing import List
+from typing import Any, List, Optional, Set
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from ..config import settings
+from ..crud import progress as crud
+from ..crud import rollups as crud_rollups
+from ..crud.progress import ProgressResult
+from ..database import engine, get_session
+from ..dependencies import authenticate, get_current_user, get_read_session
+from ..heartbeats import heartbeat_buffer
+from ..models.entities import User
+from ..replicas import remember_write
+from ..responses import json_response, render_json
+from ..schemas.progress import (
+    ProgressBatch,
+    ProgressComplete,
+    ProgressEventResult,
+    ProgressFrame,
+    ProgressLog,
+    ProgressRead,
+    ProgressStart,
+    ProgressSummary,
+    ProgressView,
+)
+from ..serializers import Row
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import selectinload
-from sqlalchemy.sql import Select
-from sqlmodel import Session, select
+router = APIRouter(prefix="/progress", tags=["progress"])
 
-from ..database import get_session
-from ..dependencies import get_current_user
-from ..models.entities import Course, ProgressStatus, User, UserProgress
-from ..schemas.progress import ProgressComplete, ProgressLog, ProgressRead, ProgressStart
 
-router = APIRouter(prefix="/progress", tags=["progress"])
+def progress_view(
+    view: ProgressView = Query(
+        ProgressView.FULL,
+        description="`compact` returns only the progress fields, `minimal` returns no body",
+    ),
+    prefer: Optional[str] = Header(None),
+) -> ProgressView:
+    """Resolve the representation requested by a progress write call.
+
+    ``Prefer: return=minimal`` (RFC 7240) takes precedence over ``view``.
+    """
 
+    if prefer and "return=minimal" in (part.strip() for part in prefer.split(",")):
+        return ProgressView.MINIMAL
+    return view
 
-def _progress_select() -> Select:
-    return (
-        select(UserProgress)
-        .options(
-            selectinload(UserProgress.user),
-            selectinload(UserProgress.course).selectinload(Course.sessions),
-            selectinload(UserProgress.course).selectinload(Course.category),
-            selectinload(UserProgress.course).selectinload(Course.level),
-            selectinload(UserProgress.course).selectinload(Course.ambience),
-        )
-        .order_by(UserProgress.updated_at.desc())
-    )
 
+def progress_response(result: ProgressResult, status_code: int = status.HTTP_200_OK) -> Response:
+    if result is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Preference-Applied": "return=minimal"})
+    return json_response(render_json(result), status_code=status_code)
 
-def _load_progress(session: Session, progress_id: int) -> UserProgress:
-    statement = _progress_select().where(UserProgress.id == progress_id)
-    progress = session.exec(statement).unique().one_or_none()
-    if not progress:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Progress not found")
-    return progress
+
+WRITE_RESPONSES = {
+    status.HTTP_204_NO_CONTENT: {"description": "Returned for `Prefer: return=minimal` or `view=minimal`"},
+}
+LOG_RESPONSES = {
+    **WRITE_RESPONSES,
+    status.HTTP_202_ACCEPTED: {"description": "Heartbeat buffered (write-behind mode)"},
+}
 
 
 @router.get("/me", response_model=List[ProgressRead])
 def list_my_progress(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_user),
-) -> List[UserProgress]:
-    statement = _progress_select().where(UserProgress.user_id == user.id)
-    progresses = session.exec(statement).unique().all()
-    return progresses
+) -> Response:
+    return json_response(render_json(crud.list_user_progress(session, user.id)))
+
+
+@router.get("/me/summary", response_model=ProgressSummary)
+def my_progress_summary(
+    session: Session = Depends(get_read_session),
+    user: User = Depends(get_current_user),
+) -> ProgressSummary:
+    """Counts by status and listened seconds, overall and per category and level.
+
+    Read from the user's rollup rows, so the cost does not grow with their history.
+    """
+
+    return crud_rollups.read_progress_summary(session, user.id)
 
 
 @router.get("/{progress_id}", response_model=ProgressRead)
 def get_progress(
     progress_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     user: User = Depends(get_current_user),
-) -> UserProgress:
-    progress = _load_progress(session, progress_id)
-    if progress.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-    return progress
+) -> Response:
+    return json_response(render_json(crud.read_progress(session, progress_id, user.id)))
 
 
-@router.post("/start", response_model=ProgressRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/start",
+    response_model=ProgressRead,
+    status_code=status.HTTP_201_CREATED,
+    responses=WRITE_RESPONSES,
+)
 def start_course(
     payload: ProgressStart,
     session: Session = Depends(get_session),
     user: User = Depends(get_current_user),
-) -> UserProgress:
-    course = session.get(Course, payload.course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    statement = select(UserProgress).where(
-        UserProgress.user_id == user.id, UserProgress.course_id == course.id
-    )
-    progress = session.exec(statement).one_or_none()
-    now = datetime.utcnow()
-    if progress is None:
-        progress = UserProgress(
-            user_id=user.id,
-            course_id=course.id,
-            status=ProgressStatus.IN_PROGRESS,
-            started_at=now,
-            updated_at=now,
-        )
-        session.add(progress)
-    else:
-        progress.status = ProgressStatus.IN_PROGRESS
-        if not progress.started_at:
-            progress.started_at = now
-        progress.updated_at = now
-        session.add(progress)
-    session.commit()
-    return _load_progress(session, progress.id)
-
-
-@router.post("/{progress_id}/log", response_model=ProgressRead)
+    view: ProgressView = Depends(progress_view),
+):
+    result = crud.start_course(session, user.id, payload.course_id, view)
+    return progress_response(result, status.HTTP_201_CREATED)
+
+
+@router.post("/batch", response_model=List[ProgressEventResult])
+def sync_progress_batch(
+    payload: ProgressBatch,
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user),
+) -> Response:
+    """Replay start/log/complete events recorded offline, in order, in one transaction.
+
+    Returns one result per event, with the compact progress right after it.
+    """
+
+    return json_response(render_json(crud.apply_progress_batch(session, user.id, payload.events)))
+
+
+@router.post("/{progress_id}/log", response_model=ProgressRead, responses=LOG_RESPONSES)
 def log_listening(
     progress_id: int,
     payload: ProgressLog,
     session: Session = Depends(get_session),
     user: User = Depends(get_current_user),
-) -> UserProgress:
-    progress = session.get(UserProgress, progress_id)
-    if not progress or progress.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Progress not found")
-    progress.total_listened_seconds += payload.listened_seconds
-    if progress.status == ProgressStatus.NOT_STARTED:
-        progress.status = ProgressStatus.IN_PROGRESS
-        if not progress.started_at:
-            progress.started_at = datetime.utcnow()
-    progress.updated_at = datetime.utcnow()
-    session.add(progress)
-    session.commit()
-    return _load_progress(session, progress.id)
-
-
-@router.post("/{progress_id}/complete", response_model=ProgressRead)
+    view: ProgressView = Depends(progress_view),
+):
+    if settings.heartbeat_write_behind:
+        crud.buffer_listening(session, progress_id, user.id, payload.listened_seconds)
+        return Response(status_code=status.HTTP_202_ACCEPTED)
+    result = crud.log_listening(session, progress_id, user.id, payload.listened_seconds, view)
+    return progress_response(result)
+
+
+@router.post("/{progress_id}/complete", response_model=ProgressRead, responses=WRITE_RESPONSES)
 def complete_course(
     progress_id: int,
     payload: ProgressComplete,
     session: Session = Depends(get_session),
     user: User = Depends(get_current_user),
-) -> UserProgress:
-    progress = session.get(UserProgress, progress_id)
-    if not progress or progress.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Progress not found")
-    if payload.listened_seconds:
-        progress.total_listened_seconds += payload.listened_seconds
-    now = datetime.utcnow()
-    progress.status = ProgressStatus.COMPLETED
-    if not progress.started_at:
-        progress.started_at = now
-    progress.completed_at = now
-    progress.updated_at = now
-    session.add(progress)
-    session.commit()
-    return _load_progress(session, progress.id)
+    view: ProgressView = Depends(progress_view),
+):
+    result = crud.complete_course(session, progress_id, user.id, payload.listened_seconds, view)
+    return progress_response(result)
+
+
+def _owns_progress(progress_id: int, user_id: int) -> bool:
+    with Session(engine) as session:
+        return crud.owns_progress(session, progress_id, user_id)
+
+
+def _complete_progress(progress_id: int, user_id: int, listened_seconds: Optional[int]) -> None:
+    with Session(engine) as session:
+        crud.complete_course(session, progress_id, user_id, listened_seconds, ProgressView.MINIMAL)
+
+
+async def handle_progress_frame(raw: Any, user: User, owned: Set[int]) -> Row:
+    """Apply one ``/progress/ws`` frame and return its ack.
+
+    Heartbeats are added to the write-behind buffer without leaving the event
+    loop once the connection has seen the progress id; only the first frame
+    for a progress id and completions use a worker thread and a connection.
+    """
+
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return {"ref": None, "code": status.HTTP_400_BAD_REQUEST, "error": "Frames must be JSON objects"}
+    ref = data.get("ref") if isinstance(data, dict) else None
+    try:
+        frame = ProgressFrame.parse_obj(data)
+    except ValidationError as exc:
+        return {"ref": ref, "code": status.HTTP_422_UNPROCESSABLE_ENTITY, "error": exc.errors()}
+
+    if frame.complete:
+        try:
+            await run_in_threadpool(_complete_progress, frame.progress_id, user.id, frame.listened_seconds)
+        except HTTPException as exc:
+            return {"ref": ref, "code": exc.status_code, "error": exc.detail}
+        owned.add(frame.progress_id)
+        remember_write(user.email)
+        return {"ref": ref, "progress_id": frame.progress_id, "status": "completed"}
+
+    if frame.listened_seconds is None:
+        return {"ref": ref, "code": status.HTTP_422_UNPROCESSABLE_ENTITY, "error": "listened_seconds is required"}
+    if frame.progress_id not in owned:
+        owner_id = heartbeat_buffer.owner_of(frame.progress_id)
+        if owner_id is None:
+            is_owner = await run_in_threadpool(_owns_progress, frame.progress_id, user.id)
+        else:
+            is_owner = owner_id == user.id
+        if not is_owner:
+            return {"ref": ref, "code": status.HTTP_404_NOT_FOUND, "error": "Progress not found"}
+        owned.add(frame.progress_id)
+    pending = heartbeat_buffer.add(frame.progress_id, frame.listened_seconds)
+    return {"ref": ref, "progress_id": frame.progress_id, "status": "buffered", "pending_seconds": pending}
+
+
+@router.websocket("/ws")
+async def progress_socket(
+    websocket: WebSocket,
+    x_user_email: str = Header(..., alias="X-User-Email"),
+    x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
+) -> None:
+    """Stream listening heartbeats on one connection.
+
+    The user is resolved once when the connection opens. Each frame
+    ``{"progress_id", "listened_seconds", "complete", "ref"}`` follows the
+    rules of ``POST /progress/{id}/log`` (always buffered, whatever
+    ``HEARTBEAT_WRITE_BEHIND`` says) or ``POST /progress/{id}/complete`` and
+    gets one ack echoing ``ref``. Invalid frames get an error ack and leave
+    the connection open.
+    """
+
+    user = await run_in_threadpool(authenticate, x_user_email, x_user_name)
+    await websocket.accept()
+    owned: Set[int] = set()
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        raw = message.get("text")
+        if raw is None:
+            raw = message.get("bytes") or b""
+        ack = await handle_progress_frame(raw, user, owned)
+        await websocket.send_text(render_json(ack).decode())
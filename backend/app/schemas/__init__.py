@@ -2,9 +2,28 @@
 
 from .ambience import AmbienceCreate, AmbienceRead, AmbienceUpdate
 from .category import CategoryCreate, CategoryRead, CategoryUpdate
-from .course import CourseCreate, CourseRead, CourseUpdate
+from .course import CourseCreate, CourseRead, CourseSummary, CourseUpdate, CourseView
+from .explain import QueryPlan
+from .exports import ExportFormat
+from .imports import CourseImportItem, CourseImportResult, CourseImportSummary, ImportStatus
 from .level import LevelCreate, LevelRead, LevelUpdate
-from .progress import ProgressComplete, ProgressLog, ProgressRead, ProgressStart
+from .pool import PoolStatus, WaitBucket
+from .progress import (
+    ProgressBatch,
+    ProgressBreakdown,
+    ProgressCompact,
+    ProgressComplete,
+    ProgressCounts,
+    ProgressEvent,
+    ProgressEventResult,
+    ProgressEventType,
+    ProgressFrame,
+    ProgressLog,
+    ProgressRead,
+    ProgressStart,
+    ProgressSummary,
+    ProgressView,
+)
 from .session import CourseSessionCreate, CourseSessionRead, CourseSessionUpdate
 from .user import UserRead
 
@@ -17,16 +36,36 @@ __all__ = [
     "CategoryUpdate",
     "CourseCreate",
     "CourseRead",
+    "CourseSummary",
     "CourseUpdate",
+    "CourseView",
+    "ExportFormat",
+    "QueryPlan",
+    "CourseImportItem",
+    "CourseImportResult",
+    "CourseImportSummary",
+    "ImportStatus",
     "LevelCreate",
     "LevelRead",
     "LevelUpdate",
+    "PoolStatus",
+    "ProgressBatch",
+    "ProgressBreakdown",
+    "ProgressCompact",
     "ProgressComplete",
+    "ProgressCounts",
+    "ProgressEvent",
+    "ProgressEventResult",
+    "ProgressEventType",
+    "ProgressFrame",
     "ProgressLog",
     "ProgressRead",
     "ProgressStart",
+    "ProgressSummary",
+    "ProgressView",
     "CourseSessionCreate",
     "CourseSessionRead",
     "CourseSessionUpdate",
     "UserRead",
+    "WaitBucket",
 ]
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import List, Optional
 
 from sqlmodel import SQLModel
@@ -30,12 +31,24 @@ class CourseUpdate(SQLModel):
     ambience_id: Optional[int] = None
 
 
-class CourseRead(CourseBase):
+class CourseView(str, Enum):
+    """Representation of the courses returned by the catalog listing."""
+
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+class CourseSummary(CourseBase):
     id: int
+    session_count: int = 0
+    sessions_total_minutes: int = 0
     category: Optional[CategoryRead] = None
     level: Optional[LevelRead] = None
     ambience: Optional[AmbienceRead] = None
-    sessions: List[CourseSessionRead] = []
 
     class Config:
         orm_mode = True
+
+
+class CourseRead(CourseSummary):
+    sessions: List[CourseSessionRead] = []
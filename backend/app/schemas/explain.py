@@ -0,0 +1,11 @@
+from typing import List
+
+from sqlmodel import Field, SQLModel
+
+
+class QueryPlan(SQLModel):
+    name: str
+    description: str
+    statement: str
+    plan: List[str] = []
+    full_scans: List[str] = Field(default=[], description="Tables read without an index")
@@ -0,0 +1,44 @@
+from enum import Enum
+from typing import List, Optional
+
+from sqlmodel import SQLModel
+
+from .session import CourseSessionBase
+
+
+class CourseImportItem(SQLModel):
+    """A course of a bulk import, with its references given by id or by name."""
+
+    title: str
+    description: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    category_id: Optional[int] = None
+    category: Optional[str] = None
+    level_id: Optional[int] = None
+    level: Optional[str] = None
+    ambience_id: Optional[int] = None
+    ambience: Optional[str] = None
+    sessions: List[CourseSessionBase] = []
+
+
+class ImportStatus(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    FAILED = "failed"
+
+
+class CourseImportResult(SQLModel):
+    index: int
+    title: Optional[str] = None
+    status: ImportStatus
+    course_id: Optional[int] = None
+    sessions: int = 0
+    detail: Optional[str] = None
+
+
+class CourseImportSummary(SQLModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    results: List[CourseImportResult] = []
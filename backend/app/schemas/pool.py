@@ -0,0 +1,27 @@
+from typing import List, Optional
+
+from sqlmodel import SQLModel
+
+
+class WaitBucket(SQLModel):
+    le_ms: Optional[float] = None
+    count: int = 0
+
+
+class PoolStatus(SQLModel):
+    name: str
+    url: str
+    pool: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout: Optional[float] = None
+    waiters: int = 0
+    timeouts: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    wait_mean_ms: float = 0.0
+    wait_max_ms: float = 0.0
+    wait_histogram: List[WaitBucket] = []
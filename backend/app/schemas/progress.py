@@ -1,13 +1,24 @@
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 
+from pydantic import root_validator
 from sqlmodel import Field, SQLModel
 
+from ..config import settings
 from ..models.entities import ProgressStatus
 from .course import CourseRead
 from .user import UserRead
 
 
+class ProgressView(str, Enum):
+    """Representation returned by the progress write endpoints."""
+
+    FULL = "full"
+    COMPACT = "compact"
+    MINIMAL = "minimal"
+
+
 class ProgressStart(SQLModel):
     course_id: int
 
@@ -24,6 +35,57 @@ class ProgressComplete(SQLModel):
     )
 
 
+class ProgressFrame(SQLModel):
+    """Message sent by clients on the ``/progress/ws`` WebSocket."""
+
+    progress_id: int
+    listened_seconds: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Additional seconds listened; required unless `complete` is true",
+    )
+    complete: bool = Field(default=False, description="Complete the course after adding `listened_seconds`")
+
+
+class ProgressEventType(str, Enum):
+    START = "start"
+    LOG = "log"
+    COMPLETE = "complete"
+
+
+class ProgressEvent(SQLModel):
+    """A progress write replayed by ``POST /progress/batch``.
+
+    ``start`` needs ``course_id``; ``log`` and ``complete`` name their progress
+    by ``progress_id`` or by ``course_id`` (for a course started in the same
+    batch), and ``log`` needs ``listened_seconds``.
+    """
+
+    type: ProgressEventType
+    course_id: Optional[int] = None
+    progress_id: Optional[int] = None
+    listened_seconds: Optional[int] = Field(default=None, gt=0)
+
+    @root_validator(skip_on_failure=True)
+    def check_fields(cls, values):
+        if values["type"] == ProgressEventType.START and values.get("course_id") is None:
+            raise ValueError("start events need course_id")
+        if values.get("course_id") is None and values.get("progress_id") is None:
+            raise ValueError("events need progress_id or course_id")
+        if values["type"] == ProgressEventType.LOG and values.get("listened_seconds") is None:
+            raise ValueError("log events need listened_seconds")
+        return values
+
+
+class ProgressBatch(SQLModel):
+    # The length is checked before any event is validated.
+    events: List[ProgressEvent] = Field(
+        min_items=1,
+        max_items=settings.progress_batch_max_events,
+        description="Applied in order, in one transaction",
+    )
+
+
 class ProgressRead(SQLModel):
     id: int
     course_id: int
@@ -37,3 +99,40 @@ class ProgressRead(SQLModel):
 
     class Config:
         orm_mode = True
+
+
+class ProgressCompact(SQLModel):
+    id: int
+    course_id: int
+    user_id: int
+    status: ProgressStatus
+    total_listened_seconds: int
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class ProgressEventResult(SQLModel):
+    index: int
+    status_code: int = Field(description="201 for a created progress, 200 for an applied event, 404 otherwise")
+    progress: Optional[ProgressCompact] = Field(default=None, description="State right after the event")
+    detail: Optional[str] = None
+
+
+class ProgressCounts(SQLModel):
+    not_started: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    listened_seconds: int = 0
+
+
+class ProgressBreakdown(ProgressCounts):
+    id: Optional[int] = Field(default=None, description="Category or level id; null for courses without one")
+
+
+class ProgressSummary(SQLModel):
+    totals: ProgressCounts
+    categories: List[ProgressBreakdown] = []
+    levels: List[ProgressBreakdown] = []
@@ -0,0 +1,243 @@
+"""Full-text search index over courses and their sessions.
+
+The index lives in a ``course_search`` table maintained by database triggers,
+so every write path (ORM, bulk import, ``COPY``) keeps it in sync:
+
+* PostgreSQL: a weighted ``tsvector`` per course (title > description >
+  sessions) behind a GIN index, built with a ``french_unaccent`` text search
+  configuration (French stemming after accent folding). Statement-level
+  triggers with transition tables refresh every touched course in one query.
+* SQLite: an FTS5 table using the ``unicode61`` tokenizer with diacritics
+  removal; stemming is approximated with prefix queries.
+
+:func:`install_search` creates the index idempotently and backfills courses
+that are missing from it; it runs from the schema migrations, and workers
+only call :func:`detect_search` at startup.
+"""
+
+import logging
+import re
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "french_unaccent"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+search_available = False
+
+_POSTGRES_DDL = f"""
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+        CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = french);
+        ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS course_search (
+    course_id integer PRIMARY KEY REFERENCES courses (id) ON DELETE CASCADE,
+    document tsvector NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_course_search_document ON course_search USING gin (document);
+
+CREATE OR REPLACE FUNCTION course_search_refresh(ids integer[]) RETURNS void LANGUAGE sql AS $$
+    INSERT INTO course_search (course_id, document)
+    SELECT c.id,
+           setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(c.title, '')), 'A')
+           || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(c.description, '')), 'B')
+           || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(s.body, '')), 'C')
+    FROM courses c
+    LEFT JOIN (
+        SELECT course_id, string_agg(coalesce(title, '') || ' ' || coalesce(description, ''), ' ') AS body
+        FROM course_sessions
+        WHERE course_id = ANY (ids)
+        GROUP BY course_id
+    ) s ON s.course_id = c.id
+    WHERE c.id = ANY (ids)
+    ON CONFLICT (course_id) DO UPDATE SET document = EXCLUDED.document
+$$;
+
+CREATE OR REPLACE FUNCTION course_search_courses_changed() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM course_search_refresh(ARRAY(SELECT id FROM new_rows));
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION course_search_sessions_changed() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM course_search_refresh(ARRAY(SELECT DISTINCT course_id FROM new_rows));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM course_search_refresh(ARRAY(SELECT course_id FROM new_rows UNION SELECT course_id FROM old_rows));
+    ELSE
+        PERFORM course_search_refresh(ARRAY(SELECT DISTINCT course_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS course_search_courses_insert ON courses;
+CREATE TRIGGER course_search_courses_insert AFTER INSERT ON courses
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION course_search_courses_changed();
+DROP TRIGGER IF EXISTS course_search_courses_update ON courses;
+CREATE TRIGGER course_search_courses_update AFTER UPDATE ON courses
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION course_search_courses_changed();
+DROP TRIGGER IF EXISTS course_search_sessions_insert ON course_sessions;
+CREATE TRIGGER course_search_sessions_insert AFTER INSERT ON course_sessions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION course_search_sessions_changed();
+DROP TRIGGER IF EXISTS course_search_sessions_update ON course_sessions;
+CREATE TRIGGER course_search_sessions_update AFTER UPDATE ON course_sessions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION course_search_sessions_changed();
+DROP TRIGGER IF EXISTS course_search_sessions_delete ON course_sessions;
+CREATE TRIGGER course_search_sessions_delete AFTER DELETE ON course_sessions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION course_search_sessions_changed();
+
+SELECT course_search_refresh(ARRAY(
+    SELECT c.id FROM courses c WHERE NOT EXISTS (SELECT 1 FROM course_search s WHERE s.course_id = c.id)
+));
+"""
+
+_SQLITE_SESSIONS_TEXT = (
+    "(SELECT group_concat(coalesce(title, '') || ' ' || coalesce(description, ''), ' ') "
+    "FROM course_sessions WHERE course_id = {course_id})"
+)
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS course_search USING fts5("
+    "title, description, sessions, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS course_search_courses_insert AFTER INSERT ON courses BEGIN "
+    "INSERT INTO course_search (rowid, title, description, sessions) VALUES "
+    f"(new.id, new.title, new.description, {_SQLITE_SESSIONS_TEXT.format(course_id='new.id')}); END",
+    "CREATE TRIGGER IF NOT EXISTS course_search_courses_update AFTER UPDATE OF title, description ON courses BEGIN "
+    "UPDATE course_search SET title = new.title, description = new.description WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS course_search_courses_delete AFTER DELETE ON courses BEGIN "
+    "DELETE FROM course_search WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS course_search_sessions_insert AFTER INSERT ON course_sessions BEGIN "
+    f"UPDATE course_search SET sessions = {_SQLITE_SESSIONS_TEXT.format(course_id='new.course_id')} "
+    "WHERE rowid = new.course_id; END",
+    "CREATE TRIGGER IF NOT EXISTS course_search_sessions_update AFTER UPDATE ON course_sessions BEGIN "
+    f"UPDATE course_search SET sessions = {_SQLITE_SESSIONS_TEXT.format(course_id='old.course_id')} "
+    "WHERE rowid = old.course_id; "
+    f"UPDATE course_search SET sessions = {_SQLITE_SESSIONS_TEXT.format(course_id='new.course_id')} "
+    "WHERE rowid = new.course_id; END",
+    "CREATE TRIGGER IF NOT EXISTS course_search_sessions_delete AFTER DELETE ON course_sessions BEGIN "
+    f"UPDATE course_search SET sessions = {_SQLITE_SESSIONS_TEXT.format(course_id='old.course_id')} "
+    "WHERE rowid = old.course_id; END",
+    "INSERT INTO course_search (rowid, title, description, sessions) "
+    f"SELECT c.id, c.title, c.description, {_SQLITE_SESSIONS_TEXT.format(course_id='c.id')} FROM courses c "
+    "WHERE c.id NOT IN (SELECT rowid FROM course_search)",
+]
+
+
+_SQLITE_TRIGGERS = (
+    "course_search_courses_insert",
+    "course_search_courses_update",
+    "course_search_courses_delete",
+    "course_search_sessions_insert",
+    "course_search_sessions_update",
+    "course_search_sessions_delete",
+)
+
+
+def _install_postgresql(connection: Connection) -> None:
+    # Serialize concurrent installs from several workers starting together.
+    connection.exec_driver_sql("SELECT pg_advisory_xact_lock(hashtext('course_search'))")
+    connection.exec_driver_sql(_POSTGRES_DDL)
+
+
+def _install_sqlite(connection: Connection) -> None:
+    for statement in _SQLITE_DDL:
+        connection.exec_driver_sql(statement)
+
+
+def install_search(connection: Connection) -> bool:
+    """Create or upgrade the search index; return whether search is available."""
+
+    global search_available
+    installers = {"postgresql": _install_postgresql, "sqlite": _install_sqlite}
+    installer = installers.get(connection.dialect.name)
+    if installer is None:
+        logger.warning("Course search is not supported on %s", connection.dialect.name)
+        return False
+    try:
+        installer(connection)
+    except OperationalError as exc:
+        if connection.dialect.name != "sqlite":
+            raise
+        logger.warning("Course search disabled, SQLite FTS5 is unavailable: %s", exc.orig)
+        return False
+    search_available = True
+    return True
+
+
+def detect_search(connection: Connection) -> bool:
+    """Enable search in this process if the migrations installed the index."""
+
+    global search_available
+    search_available = inspect(connection).has_table("course_search")
+    return search_available
+
+
+@contextmanager
+def bulk_load(connection: Connection) -> Iterator[None]:
+    """Defer index maintenance while many courses or sessions are written.
+
+    SQLite triggers fire per row and rebuild the session text of the course
+    every time, which dominates large loads; they are dropped for the
+    duration of the block and the index is rebuilt once at the end.
+    PostgreSQL triggers are statement-level and stay in place.
+    """
+
+    installed = connection.dialect.name == "sqlite" and connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'course_search'"
+    ).first()
+    if not installed:
+        yield
+        return
+    for trigger in _SQLITE_TRIGGERS:
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    yield
+    connection.exec_driver_sql("DELETE FROM course_search")
+    _install_sqlite(connection)
+
+
+def search_course_ids(session: Session, query: str, limit: int, offset: int = 0) -> List[int]:
+    """Return the ids of the courses matching ``query``, best match first."""
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = text(
+            f"SELECT course_id FROM course_search, websearch_to_tsquery('{SEARCH_CONFIG}', :query) AS query "
+            "WHERE document @@ query "
+            "ORDER BY ts_rank_cd(document, query) DESC, course_id LIMIT :limit OFFSET :offset"
+        )
+        params = {"query": query, "limit": limit, "offset": offset}
+    elif dialect == "sqlite":
+        tokens = _TOKEN.findall(query)
+        if not tokens:
+            return []
+        statement = text(
+            "SELECT rowid FROM course_search WHERE course_search MATCH :query "
+            "ORDER BY bm25(course_search, 10.0, 4.0, 1.0), rowid LIMIT :limit OFFSET :offset"
+        )
+        # Quoted prefix terms: any user input is a valid FTS5 query, and
+        # "respir" matches "respiration" in place of stemming.
+        params = {"query": " ".join(f'"{token}"*' for token in tokens), "limit": limit, "offset": offset}
+    else:
+        raise NotImplementedError(f"Course search is not supported on {dialect}")
+    return list(session.execute(statement, params).scalars())
@@ -114,6 +114,8 @@ def seed_demo_data() -> None:
                 category_id=payload["category"].id,
                 level_id=payload["level"].id,
                 ambience_id=payload["ambience"].id,
+                session_count=len(payload["sessions"]),
+                sessions_total_minutes=sum(item["duration_minutes"] for item in payload["sessions"]),
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow(),
             )
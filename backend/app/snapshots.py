@@ -0,0 +1,176 @@
+"""Published snapshots of the full catalog.
+
+The full catalog (every course with its sessions and references, rendered as
+``GET /courses/`` renders them) is the same bytes for every user.
+:class:`SnapshotPublisher` renders it once after the catalog changes and
+writes it to ``CATALOG_SNAPSHOT_DIR`` with gzip and brotli variants, so
+``GET /catalog/snapshot`` only serves files. Files are named after a digest of
+their content and written under a temporary name before being renamed, and
+the ``current`` file names the latest version: readers in any worker of the
+host never see a partial snapshot. Catalog writes schedule a publication that
+waits ``CATALOG_SNAPSHOT_DEBOUNCE_SECONDS``, so a burst of writes (an import)
+renders once.
+
+The directory is local to a host and a write only schedules a publication in
+the worker that handled it. Every worker therefore also compares the catalog
+validators (see :mod:`app.conditional`) with those of its last publication
+every ``CATALOG_SNAPSHOT_CHECK_SECONDS`` and publishes when they changed.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+import brotli
+from sqlmodel import Session
+
+from .cache import on_catalog_change
+from .conditional import CATALOG_TABLES, load_validators
+from .config import settings
+from .crud.courses import list_all_courses
+from .database import engine
+from .responses import render_json
+
+logger = logging.getLogger(__name__)
+
+# Preference order of the precompressed variants.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+CURRENT = "current"
+KEPT_VERSIONS = 3
+
+
+class Snapshot(NamedTuple):
+    version: str
+    path: Path
+
+    def variant(self, encoding: Optional[str]) -> Path:
+        """Path of the file compressed with ``encoding`` (``None``: uncompressed)."""
+
+        return self.path.with_name(self.path.name + ENCODINGS[encoding]) if encoding else self.path
+
+
+class SnapshotPublisher:
+    """Render the catalog to files after it changes and locate the latest ones."""
+
+    def __init__(self, directory: str, debounce_seconds: float, check_interval_seconds: float) -> None:
+        self.directory = Path(directory)
+        self.debounce_seconds = debounce_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._current: Optional[Tuple[int, Snapshot]] = None
+        self._digest: Optional[str] = None
+        self._publish_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current(self) -> Optional[Snapshot]:
+        """Return the latest published snapshot, reading ``current`` only when it changed."""
+
+        pointer = self.directory / CURRENT
+        try:
+            mtime = pointer.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._current
+        if cached is None or cached[0] != mtime:
+            version = pointer.read_text(encoding="ascii").strip()
+            cached = self._current = (mtime, Snapshot(version, self.directory / f"catalog-{version}.json"))
+        return cached[1]
+
+    def publish(self) -> Snapshot:
+        """Render the catalog from the primary and publish it if its content changed."""
+
+        with self._publish_lock:
+            with Session(engine) as session:
+                # Read first: a write racing the render makes the next check publish again.
+                digest = load_validators(session, CATALOG_TABLES).digest
+                body = render_json(list_all_courses(session))
+            version = hashlib.blake2b(body, digest_size=8).hexdigest()
+            snapshot = Snapshot(version, self.directory / f"catalog-{version}.json")
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not snapshot.path.exists():
+                self._write(snapshot.variant("gzip"), gzip.compress(body, compresslevel=9, mtime=0))
+                self._write(snapshot.variant("br"), brotli.compress(body, mode=brotli.MODE_TEXT))
+                # Written last: the uncompressed file marks a complete version.
+                self._write(snapshot.path, body)
+            self._write(self.directory / CURRENT, version.encode("ascii"))
+            self._prune(snapshot)
+            self._digest = digest
+            logger.info("Published catalog snapshot %s (%d bytes)", version, len(body))
+            return snapshot
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+    def _prune(self, latest: Snapshot) -> None:
+        """Remove all but the latest versions; older ones may still be read by in-flight responses."""
+
+        published = []
+        for path in self.directory.glob("catalog-*.json"):
+            if path == latest.path:
+                continue
+            try:
+                published.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                # Pruned by another worker meanwhile.
+                continue
+        published.sort(reverse=True)
+        for _, path in published[KEPT_VERSIONS - 1 :]:
+            for variant in (path, *(path.with_name(path.name + suffix) for suffix in ENCODINGS.values())):
+                variant.unlink(missing_ok=True)
+
+    def schedule(self) -> None:
+        """Ask the background thread for a publication."""
+
+        self._wake.set()
+
+    def changed(self) -> bool:
+        """Whether the catalog changed since the last publication of this worker."""
+
+        with Session(engine) as session:
+            return load_validators(session, CATALOG_TABLES).digest != self._digest
+
+    def _run(self) -> None:
+        while True:
+            woken = self._wake.wait(self.check_interval_seconds)
+            if self._stop.is_set():
+                return
+            if woken:
+                # Gather the writes of a burst; stop() interrupts the wait.
+                if self._stop.wait(self.debounce_seconds):
+                    return
+                self._wake.clear()
+            try:
+                if woken or self.changed():
+                    self.publish()
+            except Exception:
+                logger.exception("Failed to publish the catalog snapshot")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-snapshots", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+snapshot_publisher = SnapshotPublisher(
+    directory=settings.catalog_snapshot_dir,
+    debounce_seconds=settings.catalog_snapshot_debounce_seconds,
+    check_interval_seconds=settings.catalog_snapshot_check_seconds,
+)
+on_catalog_change(snapshot_publisher.schedule)
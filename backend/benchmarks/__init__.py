@@ -0,0 +1,5 @@
+"""Benchmarks driving the API in process.
+
+Each module is runnable with ``python -m backend.benchmarks.<name>`` and writes
+its results as JSON so runs can be compared across commits.
+"""
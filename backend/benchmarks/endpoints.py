@@ -0,0 +1,225 @@
+"""Throughput and latency percentiles of the hot API endpoints.
+
+The FastAPI app is driven in process through ``httpx.ASGITransport`` against a
+database seeded with :mod:`backend.app.datagen`, so no server or network is
+involved. Example::
+
+    python -m backend.benchmarks.endpoints --database-url sqlite:///bench.db \\
+        --courses 1000 --sessions 10000 --users 10000 --progress 100000 \\
+        --requests 2000 --concurrency 32 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+Request = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+ADMIN_HEADERS = {"X-Admin-Token": "bench-admin"}
+
+
+def _percentile(samples: Sequence[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient, request: Request, total: int, concurrency: int, warmup: int, seed: int
+) -> Dict[str, object]:
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        await request(client, rng)
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await request(client, rng)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(_percentile(latencies, 0.50), 3),
+            "p95": round(_percentile(latencies, 0.95), 3),
+            "p99": round(_percentile(latencies, 0.99), 3),
+            "max": round(max(latencies), 3),
+        },
+    }
+
+
+def _scenarios(users: List[int], courses: List[int], owned: List[tuple], page_size: int) -> Dict[str, Request]:
+    def user_headers(user_id: int) -> Dict[str, str]:
+        return {"X-User-Email": f"user{user_id}@load.test"}
+
+    cursors: List[Optional[str]] = [None]
+
+    async def catalog_list(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        cursor = rng.choice(cursors)
+        params = {"limit": page_size, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/courses/", params=params)
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor and len(cursors) < 1000:
+            cursors.append(next_cursor)
+        return response
+
+    async def catalog_get(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get(f"/courses/{rng.choice(courses)}")
+
+    async def progress_me(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get("/progress/me", headers=user_headers(rng.choice(users)))
+
+    async def progress_start(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        payload = {"course_id": rng.choice(courses)}
+        return await client.post("/progress/start", json=payload, headers=user_headers(rng.choice(users)))
+
+    async def progress_log(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        progress_id, user_id = rng.choice(owned)
+        return await client.post(
+            f"/progress/{progress_id}/log", json={"listened_seconds": 5}, headers=user_headers(user_id)
+        )
+
+    async def progress_complete(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        progress_id, user_id = rng.choice(owned)
+        return await client.post(f"/progress/{progress_id}/complete", json={}, headers=user_headers(user_id))
+
+    return {
+        "catalog_list": catalog_list,
+        "catalog_get": catalog_get,
+        "progress_me": progress_me,
+        "progress_start": progress_start,
+        "progress_log": progress_log,
+        "progress_complete": progress_complete,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    # Settings are read at import time, so configure the app before importing it.
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["ADMIN_API_KEY"] = ADMIN_HEADERS["X-Admin-Token"]
+    os.environ["ASYNC_DATABASE"] = "true" if args.async_database else "false"
+    for assignment in args.env:
+        key, _, value = assignment.partition("=")
+        os.environ[key] = value
+
+    from sqlalchemy import select
+
+    from backend.app.cache import invalidate_catalog
+    from backend.app.config import settings
+    from backend.app.database import engine
+    from backend.app.datagen import DatasetSpec, generate_dataset
+    from backend.app.main import app
+    from backend.app.models.entities import Course, User, UserProgress
+
+    spec = DatasetSpec(
+        courses=args.courses, sessions=args.sessions, users=args.users, progress=args.progress, seed=args.seed
+    )
+    if not args.skip_seed:
+        generate_dataset(engine, spec, reset=True)
+
+    sample = random.Random(args.seed)
+    with engine.connect() as connection:
+        users = list(connection.execute(select(User.id)).scalars())
+        courses = list(connection.execute(select(Course.id)).scalars())
+        owned = [tuple(row) for row in connection.execute(select(UserProgress.id, UserProgress.user_id).limit(50_000))]
+    users = sample.sample(users, min(len(users), 10_000))
+    scenarios = _scenarios(users, courses, owned, args.page_size)
+    selected = args.scenario or list(scenarios)
+
+    results: Dict[str, object] = {}
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in selected:
+                invalidate_catalog()
+                results[name] = await _run_scenario(
+                    client, scenarios[name], args.requests, args.concurrency, args.warmup, args.seed
+                )
+                print(f"{name:>20}: {json.dumps(results[name])}", file=sys.stderr)
+    finally:
+        await app.router.shutdown()
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "async_database": settings.async_database,
+            "heartbeat_write_behind": settings.heartbeat_write_behind,
+            "dataset": asdict(spec),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "page_size": args.page_size,
+        },
+        "scenarios": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Respir API endpoints in process.")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--async-database", action="store_true", help="Serve the async routers")
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--progress", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the data already in the database")
+    parser.add_argument("--requests", type=int, default=1_000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--scenario", action="append", help="Run only these scenarios (repeatable)")
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE settings for the app")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(rendered + "\n")
+    else:
+        print(rendered)
+
+
+if __name__ == "__main__":
+    main()
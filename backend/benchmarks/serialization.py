@@ -0,0 +1,145 @@
+"""CPU cost of rendering the catalog and progress responses.
+
+Compares, on rows loaded once from a database seeded with
+:mod:`backend.app.datagen`, the validated path (``Schema.from_orm`` then
+``jsonable_encoder`` and ``JSONResponse``, what FastAPI does for a
+``response_model``) with the dict path of :mod:`backend.app.serializers`
+encoded by orjson. Both must render identical bytes. Example::
+
+    python -m backend.benchmarks.serialization --database-url sqlite:///bench.db \\
+        --courses 1000 --sessions 10000 --repeat 200 --output serialization.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .endpoints import _git_commit, _percentile
+
+
+def _measure(render: Callable[[], bytes], repeat: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        render()
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.process_time()
+        render()
+        samples.append(time.process_time() - started)
+    return {
+        "cpu_mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "cpu_p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+        "cpu_p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    # Settings are read at import time, so configure the app before importing it.
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import func, select
+    from sqlmodel import Session
+
+    from backend.app.crud.courses import course_select, load_courses
+    from backend.app.crud.progress import load_progresses, progress_select
+    from backend.app.database import engine
+    from backend.app.datagen import DatasetSpec, generate_dataset
+    from backend.app.models.entities import UserProgress
+    from backend.app.responses import render_json
+    from backend.app.schemas.course import CourseRead, CourseSummary
+    from backend.app.schemas.progress import ProgressRead
+    from backend.app.serializers import dump_all
+
+    spec = DatasetSpec(
+        courses=args.courses, sessions=args.sessions, users=args.users, progress=args.progress, seed=args.seed
+    )
+    if not args.skip_seed:
+        generate_dataset(engine, spec, reset=True)
+
+    with Session(engine) as session:
+        courses = load_courses(session, course_select())
+        busiest_user = session.execute(
+            select(UserProgress.user_id).group_by(UserProgress.user_id).order_by(func.count().desc()).limit(1)
+        ).scalar_one()
+        progress = load_progresses(session, progress_select().where(UserProgress.user_id == busiest_user))
+
+    cases: Dict[str, tuple] = {
+        "catalog_page_full": (CourseRead, courses[: args.page_size]),
+        "catalog_page_summary": (CourseSummary, courses[: args.page_size]),
+        "catalog_all_full": (CourseRead, courses),
+        "progress_me": (ProgressRead, progress),
+    }
+
+    results: Dict[str, Any] = {}
+    for name in args.case or list(cases):
+        schema, rows = cases[name]
+
+        def validated() -> bytes:
+            return JSONResponse(content=jsonable_encoder([schema.from_orm(row) for row in rows])).body
+
+        def fast() -> bytes:
+            return render_json(dump_all(schema, rows))
+
+        body = validated()
+        if fast() != body:
+            raise SystemExit(f"{name}: the dict path renders a different body")
+        before = _measure(validated, args.repeat, args.warmup)
+        after = _measure(fast, args.repeat, args.warmup)
+        results[name] = {
+            "rows": len(rows),
+            "bytes": len(body),
+            "validated": before,
+            "fast": after,
+            "speedup": round(before["cpu_mean_ms"] / after["cpu_mean_ms"], 2) if after["cpu_mean_ms"] else None,
+        }
+        print(f"{name:>22}: {json.dumps(results[name])}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "dataset": asdict(spec),
+            "repeat": args.repeat,
+            "page_size": args.page_size,
+        },
+        "cases": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the CPU cost of rendering API responses.")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--progress", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the data already in the database")
+    parser.add_argument("--repeat", type=int, default=100, help="Measured renderings per case and path")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--case", action="append", help="Run only these cases (repeatable)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(rendered + "\n")
+    else:
+        print(rendered)
+
+
+if __name__ == "__main__":
+    main()